@@ -1,9 +1,16 @@
 import streamlit as st
 import streamlit.components.v1 as components
+import re
 import requests
 import gspread
 from google.oauth2.service_account import Credentials
 from datetime import datetime
+from barcode_decode import decode_many
+from book_lookup import BookLookup
+from isbn_index import IsbnIndex
+from library_search import LibrarySearch
+from live_scanner import IsbnScanner
+from streamlit_webrtc import webrtc_streamer
 
 # -----------------------------
 # CONFIG
@@ -28,35 +35,94 @@ creds = Credentials.from_service_account_info(
 client = gspread.authorize(creds)
 sheet = client.open_by_key(SHEET_ID).sheet1
 
+
+# Local ISBN -> row index, shared across sessions and resynced by range
+@st.cache_resource
+def get_isbn_index():
+    return IsbnIndex(sheet)
+
+
+# Full-text search over the cached rows, kept current by the index
+@st.cache_resource
+def get_library_search():
+    return LibrarySearch.attach(get_isbn_index())
+
+
+isbn_index = get_isbn_index()
+isbn_index.sync()
+library_search = get_library_search()
+
 # -----------------------------
 # FUNCTIONS
 # -----------------------------
 
-def fetch_book(isbn):
-    url = f"https://www.googleapis.com/books/v1/volumes?q=isbn:{isbn}"
-    response = requests.get(url)
-    data = response.json()
-
-    if "items" not in data:
-        return None
+# On-disk Google Books cache with a pooled HTTP session, shared across sessions
+@st.cache_resource
+def get_book_lookup():
+    return BookLookup()
 
-    volume = data["items"][0]["volumeInfo"]
 
-    return {
-        "title": volume.get("title", ""),
-        "authors": ", ".join(volume.get("authors", [])),
-        "publisher": volume.get("publisher", ""),
-        "published_date": volume.get("publishedDate", ""),
-        "thumbnail": volume.get("imageLinks", {}).get("thumbnail", "")
-    }
+def fetch_book(isbn):
+    return get_book_lookup().fetch(isbn)
 
 
 def isbn_exists(isbn):
-    records = sheet.get_all_records()
-    for row in records:
-        if str(row["ISBN"]) == str(isbn):
-            return True
-    return False
+    return isbn_index.contains(isbn)
+
+
+def book_row(isbn, book):
+    return [
+        datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        isbn,
+        book["title"],
+        book["authors"],
+        book["publisher"],
+        book["published_date"],
+        "Not Started",
+        "",
+        ""
+    ]
+
+
+def parse_isbns(text):
+    # ISBN-10/13 tokens from free text or CSV, hyphens ignored
+    candidates = re.findall(r"[0-9][0-9\-]*[0-9Xx]", text)
+    isbns = [c.replace("-", "").upper() for c in candidates]
+    return [isbn for isbn in isbns if len(isbn) in (10, 13)]
+
+
+def bulk_add(isbns):
+    # Returns per-ISBN status rows; all new books go to the sheet in one append
+    status = []
+    to_fetch = []
+    seen = set()
+    for isbn in isbns:
+        if isbn in seen:
+            status.append({"ISBN": isbn, "Status": "Duplicate in list", "Title": ""})
+        elif isbn_exists(isbn):
+            status.append({"ISBN": isbn, "Status": "Already in library", "Title": ""})
+        else:
+            to_fetch.append(isbn)
+        seen.add(isbn)
+
+    results = get_book_lookup().fetch_many(to_fetch)
+
+    rows = []
+    for isbn in to_fetch:
+        book, error = results[isbn]
+        if error is not None:
+            status.append({"ISBN": isbn, "Status": f"Lookup failed: {error}", "Title": ""})
+        elif book is None:
+            status.append({"ISBN": isbn, "Status": "Not found", "Title": ""})
+        else:
+            rows.append(book_row(isbn, book))
+            status.append({"ISBN": isbn, "Status": "Added", "Title": book["title"]})
+
+    if rows:
+        response = sheet.append_rows(rows)
+        isbn_index.add_rows(rows, response)
+
+    return status
 
 
 # -----------------------------
@@ -67,6 +133,8 @@ st.set_page_config(page_title="My ISBN Library")
 st.title("📚 My ISBN Library")
 st.markdown("### 📷 Scan Book Barcode")
 
+scanner_mode = st.radio("Scanner", ["Live camera", "Browser scanner"], horizontal=True)
+
 # Scanner (browser-side)
 html_code = """
 <div id="reader" style="width:300px;"></div>
@@ -95,10 +163,37 @@ scanner.render(onScanSuccess);
 </script>
 """
 
-components.html(html_code, height=400)
+
+def use_scanned_isbn(scanner):
+    if scanner.last_isbn:
+        st.session_state["isbn_input"] = scanner.last_isbn
+
+
+if scanner_mode == "Live camera":
+    # Scanner (server-side, decoded with pyzbar on a worker thread)
+    ctx = webrtc_streamer(
+        key="isbn-scanner",
+        video_processor_factory=IsbnScanner,
+        media_stream_constraints={"video": True, "audio": False},
+        async_processing=True
+    )
+
+    if ctx.video_processor:
+        stats = ctx.video_processor.stats()
+        col1, col2, col3 = st.columns(3)
+        col1.metric("Last ISBN", stats["last_isbn"] or "—")
+        col2.metric(
+            "Decode Latency (ms)",
+            f"{stats['last_latency_ms']:.0f}" if stats["last_latency_ms"] is not None else "—",
+            help=f"Average {stats['avg_latency_ms'] or 0:.0f} ms over {stats['decodes']} decodes"
+        )
+        col3.metric("Frames Dropped", f"{stats['dropped']} / {stats['frames']}")
+        st.button("⬇️ Use Scanned ISBN", on_click=use_scanned_isbn, args=(ctx.video_processor,))
+else:
+    components.html(html_code, height=400)
 
 # Text input (IMPORTANT: keep label containing ISBN)
-isbn_input = st.text_input("Scanned ISBN will appear here")
+isbn_input = st.text_input("Scanned ISBN will appear here", key="isbn_input")
 
 # -----------------------------
 # ADD BOOK
@@ -114,20 +209,18 @@ if st.button("➕ Add Book"):
         if isbn_exists(isbn):
             st.warning("⚠ Book already exists.")
         else:
-            book = fetch_book(isbn)
+            try:
+                book = fetch_book(isbn)
+                lookup_failed = False
+            except requests.RequestException as e:
+                book = None
+                lookup_failed = True
+                st.error(f"Could not reach Google Books: {e}")
 
             if book:
-                sheet.append_row([
-                    datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                    isbn,
-                    book["title"],
-                    book["authors"],
-                    book["publisher"],
-                    book["published_date"],
-                    "Not Started",
-                    "",
-                    ""
-                ])
+                row = book_row(isbn, book)
+                response = sheet.append_row(row)
+                isbn_index.add(row, response)
 
                 st.success("✅ Book added successfully!")
 
@@ -139,19 +232,90 @@ if st.button("➕ Add Book"):
                 st.write("**Publisher:**", book["publisher"])
                 st.write("**Published:**", book["published_date"])
 
-            else:
+            elif not lookup_failed:
                 st.error("Book not found in Google Books.")
 
 
+# -----------------------------
+# BULK IMPORT
+# -----------------------------
+
+with st.expander("📦 Bulk Import ISBNs"):
+    pasted = st.text_area("Paste ISBNs (one per line, or any separator)")
+    isbn_file = st.file_uploader("...or upload a CSV of ISBNs", type=["csv", "txt"])
+
+    if st.button("📥 Import All"):
+        text = pasted
+        if isbn_file is not None:
+            text += "\n" + isbn_file.getvalue().decode("utf-8", errors="ignore")
+        isbns = parse_isbns(text)
+
+        if not isbns:
+            st.warning("No ISBNs found.")
+        else:
+            with st.spinner(f"Looking up {len(isbns)} ISBNs..."):
+                status = bulk_add(isbns)
+            added = sum(1 for s in status if s["Status"] == "Added")
+            st.success(f"✅ Added {added} of {len(isbns)} books.")
+            st.dataframe(status, use_container_width=True)
+
+
+# -----------------------------
+# SHELF PHOTOS
+# -----------------------------
+
+with st.expander("🖼️ Scan Shelf Photos"):
+    photos = st.file_uploader(
+        "Upload photos of book barcodes (many books per photo is fine)",
+        type=["jpg", "jpeg", "png"],
+        accept_multiple_files=True
+    )
+
+    if photos and st.button("🔍 Decode Barcodes"):
+        with st.spinner(f"Decoding {len(photos)} photos..."):
+            decoded = decode_many([photo.getvalue() for photo in photos])
+
+        st.session_state["photo_isbns"] = list(dict.fromkeys(isbn for isbns in decoded for isbn in isbns))
+        st.dataframe(
+            [{"Photo": photo.name, "ISBNs Found": len(isbns), "ISBNs": ", ".join(isbns)}
+             for photo, isbns in zip(photos, decoded)],
+            use_container_width=True
+        )
+
+    photo_isbns = st.session_state.get("photo_isbns", [])
+    if photo_isbns:
+        st.write(f"**{len(photo_isbns)} unique ISBNs decoded.**")
+        if st.button("📥 Add Decoded Books"):
+            with st.spinner(f"Looking up {len(photo_isbns)} ISBNs..."):
+                status = bulk_add(photo_isbns)
+            added = sum(1 for s in status if s["Status"] == "Added")
+            st.success(f"✅ Added {added} of {len(photo_isbns)} books.")
+            st.dataframe(status, use_container_width=True)
+            st.session_state["photo_isbns"] = []
+
+
 # -----------------------------
 # LIBRARY
 # -----------------------------
 
 st.markdown("## 📖 Library")
 
-records = sheet.get_all_records()
+if st.button("🔄 Resync Library"):
+    isbn_index.rebuild()
+
+query = st.text_input("🔍 Search title, author or publisher")
+per_page = 25
+total, page_records = library_search.search(query, page=1, per_page=per_page)
+pages = max(1, -(-total // per_page))
+
+if pages > 1:
+    page = st.number_input(f"Page (of {pages})", min_value=1, max_value=pages, value=1)
+    total, page_records = library_search.search(query, page=page, per_page=per_page)
 
-if records:
-    st.dataframe(records, use_container_width=True)
+if page_records:
+    st.caption(f"{total} books" + (f" matching '{query}'" if query else ""))
+    st.dataframe(page_records, use_container_width=True)
+elif query:
+    st.info("No books match your search.")
 else:
     st.info("No books added yet.")
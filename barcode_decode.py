@@ -0,0 +1,55 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+import numpy as np
+from pyzbar.pyzbar import ZBarSymbol, decode
+
+# -----------------------------
+# SERVER-SIDE BARCODE DECODING
+# -----------------------------
+# Decodes every EAN-13 book barcode (ISBN-13, 978/979 prefix) in shelf or
+# spine photos. Images are converted to grayscale and downscaled before
+# decoding, and batches are spread over a thread pool: OpenCV and zbar
+# release the GIL, so threads decode in parallel without forking the server.
+
+MAX_SIDE = 1600
+
+
+def preprocess(image, max_side=MAX_SIDE):
+    gray = image if image.ndim == 2 else cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    h, w = gray.shape
+    scale = max_side / max(h, w)
+    if scale < 1:
+        gray = cv2.resize(gray, (int(w * scale), int(h * scale)), interpolation=cv2.INTER_AREA)
+    return gray
+
+
+def decode_isbns_from_array(image, max_side=MAX_SIDE, retry_full=True):
+    gray = preprocess(image, max_side)
+    found = decode(gray, symbols=[ZBarSymbol.EAN13])
+    if not found and retry_full and gray.shape != image.shape[:2]:
+        # Small barcodes in a wide shelf shot can vanish when downscaled
+        found = decode(preprocess(image, max(image.shape[:2])), symbols=[ZBarSymbol.EAN13])
+
+    isbns = []
+    for symbol in found:
+        code = symbol.data.decode("ascii", errors="ignore")
+        if code.startswith(("978", "979")) and code not in isbns:
+            isbns.append(code)
+    return isbns
+
+
+def decode_isbns(image_bytes, max_side=MAX_SIDE):
+    image = cv2.imdecode(np.frombuffer(image_bytes, np.uint8), cv2.IMREAD_COLOR)
+    if image is None:
+        return []
+    return decode_isbns_from_array(image, max_side)
+
+
+def decode_many(images, max_workers=None):
+    # images: list of encoded image bytes; returns one ISBN list per image
+    if len(images) <= 1:
+        return [decode_isbns(image) for image in images]
+    with ThreadPoolExecutor(max_workers=max_workers or os.cpu_count()) as pool:
+        return list(pool.map(decode_isbns, images))
@@ -1,30 +1,73 @@
+import os
+
 import streamlit as st
 import pandas as pd
+from corp_actions import action_view, classify_actions
+from corp_actions_store import CorpActionStore
 
 st.set_page_config(page_title="NSE Corporate Actions Parser", layout="wide")
 st.title("📄 NSE Corporate Actions – BCDDMMYY.csv Parser")
 
-uploaded_file = st.file_uploader("Upload bcddmmyy.csv file", type=["csv"])
+# Server-side folder ingest is only offered when this root is configured, and
+# only for folders inside it
+BC_FOLDER_ROOT = os.environ.get("BC_FOLDER_ROOT")
 
-if uploaded_file:
-    df = pd.read_csv(uploaded_file)
-    df.columns = df.columns.str.strip()
 
-    # Filter for SERIES == 'EQ'
-    df_eq = df[df['SERIES'] == 'EQ']
+# Local archive of every BC file ingested so far
+@st.cache_resource
+def get_store():
+    return CorpActionStore()
+
+
+def resolve_folder(name):
+    # Path inside BC_FOLDER_ROOT, or None if it would escape the root
+    root = os.path.realpath(BC_FOLDER_ROOT)
+    path = os.path.realpath(os.path.join(root, name))
+    return path if os.path.commonpath([root, path]) == root else None
+
+
+store = get_store()
 
-    # Convert PURPOSE to upper case to normalize
-    df_eq['PURPOSE'] = df_eq['PURPOSE'].str.upper()
+uploaded_files = st.file_uploader("Upload bcddmmyy.csv files", type=["csv"], accept_multiple_files=True)
 
-    # Filter different corporate actions
-    rights_df = df_eq[df_eq['PURPOSE'].str.contains("RIGHT")]
-    bonus_df = df_eq[df_eq['PURPOSE'].str.contains("BONUS")]
-    demerger_df = df_eq[df_eq['PURPOSE'].str.contains("DEMERGER")]
-    split_df = df_eq[df_eq['PURPOSE'].str.contains("FV SPLIT|FVSPLT|FACE VALUE|SPLIT")]  # broader matching
+with st.sidebar:
+    st.header("📚 Archive")
+    if BC_FOLDER_ROOT:
+        folder = st.text_input("Ingest a folder of BC files (relative to the BC folder root)")
+        if folder and st.button("📥 Ingest Folder"):
+            path = resolve_folder(folder)
+            if path is None or not os.path.isdir(path):
+                st.error("Folder not found under the configured root.")
+            else:
+                with st.spinner("Ingesting..."):
+                    st.write(store.ingest_folder(path))
+    st.caption(f"{store.count():,} actions archived")
 
-    # Identify other actions
-    known_keywords = ["RIGHT", "BONUS", "DEMERGER", "FV SPLIT", "FVSPLT", "FACE VALUE", "SPLIT"]
-    others_df = df_eq[~df_eq['PURPOSE'].apply(lambda x: any(keyword in x for keyword in known_keywords))]
+if uploaded_files:
+    uploads = [(file.name, file.getvalue()) for file in uploaded_files]
+    status = store.ingest(uploads)
+    new_rows = sum(n for n in status.values() if isinstance(n, int))
+    skipped = sum(1 for n in status.values() if n == "skipped")
+    st.caption(f"Archived {new_rows} new actions; {skipped} file(s) already ingested.")
+    for filename, result in status.items():
+        if isinstance(result, str) and result.startswith("error"):
+            st.error(f"{filename}: {result}")
+
+    # Classified frames are kept by content hash, so reruns do not re-parse
+    loaded = store.load(uploads)
+    frames = [classified for classified, error in loaded.values() if error is None]
+    if frames:
+        df = pd.concat(frames, ignore_index=True).drop_duplicates()
+    else:
+        # Every file failed to parse (reported above); show empty tabs
+        df = classify_actions(pd.DataFrame(columns=['SERIES', 'PURPOSE']))
+    df_eq = df[df['SERIES'] == 'EQ']
+
+    rights_df = action_view(df_eq, 'Rights')
+    bonus_df = action_view(df_eq, 'Bonus')
+    demerger_df = action_view(df_eq, 'Demerger')
+    split_df = action_view(df_eq, 'Split')
+    others_df = action_view(df_eq, 'Others')
 
     tabs = st.tabs(["Rights Issue", "Bonus Issue", "Demerger", "Face Value Split", "Others"])
 
@@ -49,3 +92,20 @@ if uploaded_file:
         st.dataframe(others_df.reset_index(drop=True))
 else:
     st.info("Please upload a valid bcddmmyy.csv file to view corporate actions.")
+
+# ---------- ARCHIVE SEARCH ----------
+if store.count():
+    st.header("🗄️ Corporate Actions Archive")
+    search_tab, range_tab = st.tabs(["By Symbol", "By Date Range"])
+
+    with search_tab:
+        symbol = st.text_input("Symbol")
+        if symbol:
+            st.dataframe(store.actions_for(symbol))
+
+    with range_tab:
+        col1, col2, col3 = st.columns(3)
+        start = col1.date_input("From", value=pd.Timestamp.today() - pd.DateOffset(months=3))
+        end = col2.date_input("To", value=pd.Timestamp.today())
+        category = col3.selectbox("Action", ["All", "Rights", "Bonus", "Demerger", "Split", "Others"])
+        st.dataframe(store.actions_between(start, end, None if category == "All" else category))
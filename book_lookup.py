@@ -0,0 +1,145 @@
+import json
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# -----------------------------
+# GOOGLE BOOKS LOOKUP
+# -----------------------------
+# Metadata is cached on disk by ISBN, including "not found" answers (for a
+# shorter time), and all requests share one keep-alive session with timeouts
+# and retries.
+
+BOOKS_API = "https://www.googleapis.com/books/v1/volumes"
+CACHE_PATH = "book_cache.sqlite3"
+
+DAY = 24 * 60 * 60
+
+
+def make_session(retries=3, pool_size=16):
+    retry = Retry(
+        total=retries,
+        backoff_factor=0.5,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=("GET",),
+    )
+    adapter = HTTPAdapter(max_retries=retry, pool_connections=pool_size, pool_maxsize=pool_size)
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def parse_volume(data):
+    if "items" not in data:
+        return None
+
+    volume = data["items"][0]["volumeInfo"]
+
+    return {
+        "title": volume.get("title", ""),
+        "authors": ", ".join(volume.get("authors", [])),
+        "publisher": volume.get("publisher", ""),
+        "published_date": volume.get("publishedDate", ""),
+        "thumbnail": volume.get("imageLinks", {}).get("thumbnail", "")
+    }
+
+
+class RateLimiter:
+    # Spaces calls at least 1 / rate seconds apart across all threads
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate if rate else 0.0
+        self._lock = threading.Lock()
+        self._next = 0.0
+
+    def wait(self):
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next)
+            self._next = start + self.interval
+        if start > now:
+            time.sleep(start - now)
+
+
+class BookLookup:
+
+    def __init__(self, cache_path=CACHE_PATH, api_url=BOOKS_API, ttl=30 * DAY,
+                 negative_ttl=DAY, timeout=(3.05, 10), session=None, rate=10):
+        self.api_url = api_url
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.timeout = timeout
+        self.session = session or make_session()
+        self.limiter = RateLimiter(rate)
+
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(cache_path, check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS books (isbn TEXT PRIMARY KEY, book TEXT, fetched_at REAL NOT NULL)"
+        )
+        self._db.commit()
+
+    def cached(self, isbn):
+        # (hit, book) where book is None for a cached "not found"
+        with self._lock:
+            row = self._db.execute(
+                "SELECT book, fetched_at FROM books WHERE isbn = ?", (isbn,)
+            ).fetchone()
+        if row is None:
+            return False, None
+
+        book, fetched_at = row
+        ttl = self.ttl if book is not None else self.negative_ttl
+        if time.time() - fetched_at > ttl:
+            return False, None
+        return True, (json.loads(book) if book is not None else None)
+
+    def store(self, isbn, book):
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO books (isbn, book, fetched_at) VALUES (?, ?, ?)",
+                (isbn, json.dumps(book) if book is not None else None, time.time()),
+            )
+            self._db.commit()
+
+    def fetch(self, isbn):
+        isbn = str(isbn).strip()
+        hit, book = self.cached(isbn)
+        if hit:
+            return book
+
+        self.limiter.wait()
+        response = self.session.get(self.api_url, params={"q": f"isbn:{isbn}"}, timeout=self.timeout)
+        response.raise_for_status()
+        book = parse_volume(response.json())
+
+        self.store(isbn, book)
+        return book
+
+    def fetch_many(self, isbns, max_workers=8):
+        # {isbn: (book, error)}; cache hits skip the pool and the rate limit
+        results = {}
+        misses = []
+        for isbn in isbns:
+            hit, book = self.cached(isbn)
+            if hit:
+                results[isbn] = (book, None)
+            else:
+                misses.append(isbn)
+
+        def lookup(isbn):
+            try:
+                return isbn, (self.fetch(isbn), None)
+            except requests.RequestException as e:
+                return isbn, (None, e)
+
+        if misses:
+            with ThreadPoolExecutor(max_workers=max_workers) as pool:
+                results.update(pool.map(lookup, misses))
+        return results
@@ -0,0 +1,38 @@
+import hashlib
+import threading
+from collections import OrderedDict
+
+# -----------------------------
+# SHARED CACHING HELPERS
+# -----------------------------
+# Content hashing and a bounded in-memory map, used by the apps that cache
+# parsed uploads by file content.
+
+CACHE_ENTRIES = 128
+
+
+def file_hash(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+class LRUCache:
+    # Thread-safe bounded map; least recently used entries are evicted first
+
+    def __init__(self, max_entries=CACHE_ENTRIES):
+        self.max_entries = max_entries
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            if key in self._items:
+                self._items.move_to_end(key)
+                return self._items[key]
+        return None
+
+    def put(self, key, value):
+        with self._lock:
+            self._items[key] = value
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_entries:
+                self._items.popitem(last=False)
@@ -0,0 +1,106 @@
+import numpy as np
+import pandas as pd
+
+# -----------------------------
+# CORPORATE ACTION ADJUSTMENTS
+# -----------------------------
+# Lots are joined to every later action on the same symbol, and a per-lot
+# cumulative product of quantity factors (bonus x split, optionally rights)
+# gives adjusted quantities and average costs in one pass. Price history is
+# adjusted with an as-of join to the product of all factors after each date.
+
+
+def action_events(actions, include_rights=False):
+    # actions: rows as stored by CorpActionStore (symbol, ex_date/record_date,
+    # quantity_factor, rights_*). Returns symbol, date, factor, rights columns.
+    date = pd.to_datetime(actions['ex_date'], errors='coerce') if 'ex_date' in actions else None
+    record = pd.to_datetime(actions['record_date'], errors='coerce')
+    events = pd.DataFrame({
+        'symbol': actions['symbol'].astype(str).str.strip().str.upper(),
+        'date': record if date is None else date.fillna(record),
+        'factor': pd.to_numeric(actions['quantity_factor'], errors='coerce').fillna(1.0),
+        'rights_ratio': 0.0,
+        'rights_price': 0.0,
+    })
+
+    if include_rights:
+        held = pd.to_numeric(actions['rights_held'], errors='coerce')
+        ratio = (pd.to_numeric(actions['rights_new'], errors='coerce') / held).fillna(0.0)
+        price = pd.to_numeric(actions['rights_price'], errors='coerce')
+        # Without an issue price (e.g. only the premium was quoted) the cost
+        # of subscribing is unknown, so such rights are not applied at all
+        events['rights_ratio'] = ratio.where(price.notna(), 0.0)
+        events['rights_price'] = price.fillna(0.0)
+
+    events = events[events['date'].notna() & ((events['factor'] != 1.0) | (events['rights_ratio'] > 0))]
+    return events.sort_values(['symbol', 'date'], ignore_index=True)
+
+
+def adjust_lots(lots, events, symbol_col='ScripName', date_col='Buy Date',
+                qty_col='Quantity', cost_col='Buying Quanta'):
+    # Adds Adj Factor, Adj Quantity, Rights Cost, Adj Cost and Adj Avg Cost.
+    # Only actions strictly after a lot's buy date apply to it.
+    out = lots.copy()
+    lot = pd.DataFrame({
+        'lot': np.arange(len(out)),
+        'symbol': out[symbol_col].astype(str).str.strip().str.upper().to_numpy(),
+        'buy_date': pd.to_datetime(out[date_col], errors='coerce').to_numpy(),
+        'qty': pd.to_numeric(out[qty_col], errors='coerce').to_numpy(),
+    })
+
+    joined = lot.merge(events, on='symbol', how='inner')
+    joined = joined[joined['date'] > joined['buy_date']].sort_values(['lot', 'date'])
+
+    step = joined['factor'] * (1 + joined['rights_ratio'])
+    cum = step.groupby(joined['lot']).cumprod()
+    before = cum / step
+    # Rights shares are bought on the holding just before the issue
+    joined['rights_cost'] = (
+        joined['qty'] * before * joined['factor'] * joined['rights_ratio'] * joined['rights_price']
+    )
+    joined['cum'] = cum
+
+    per_lot = joined.groupby('lot').agg(factor=('cum', 'last'), rights_cost=('rights_cost', 'sum'))
+    factor = per_lot['factor'].reindex(lot['lot'], fill_value=1.0).to_numpy()
+    rights_cost = per_lot['rights_cost'].reindex(lot['lot'], fill_value=0.0).to_numpy()
+
+    cost = pd.to_numeric(out[cost_col], errors='coerce').to_numpy()
+    out['Adj Factor'] = factor
+    out['Adj Quantity'] = lot['qty'].to_numpy() * factor
+    out['Rights Cost'] = rights_cost
+    out['Adj Cost'] = cost + rights_cost
+    with np.errstate(divide='ignore', invalid='ignore'):
+        out['Adj Avg Cost'] = out['Adj Cost'] / out['Adj Quantity']
+    return out
+
+
+def adjust_prices(prices, events, symbol_col='symbol', date_col='date', price_col='close'):
+    # Continuous history: each price is divided by the product of all quantity
+    # factors with an ex-date after it. Rights are not applied to prices.
+    out = prices.copy()
+    px = pd.DataFrame({
+        'row': np.arange(len(out)),
+        'symbol': out[symbol_col].astype(str).str.strip().str.upper().to_numpy(),
+        'date': pd.to_datetime(out[date_col]).to_numpy(),
+    }).sort_values('date')
+
+    ev = events[events['factor'] != 1.0].sort_values(['symbol', 'date'], ascending=[True, False])
+    # Product of this and every later factor for the symbol
+    ev = ev.assign(suffix=ev.groupby('symbol')['factor'].cumprod()).sort_values('date')
+
+    matched = pd.merge_asof(
+        px, ev[['symbol', 'date', 'suffix']], on='date', by='symbol',
+        direction='forward', allow_exact_matches=False
+    )
+    divisor = matched.set_index('row')['suffix'].reindex(np.arange(len(out))).fillna(1.0).to_numpy()
+
+    out['Adj Factor'] = divisor
+    out[f'Adj {price_col}'] = pd.to_numeric(out[price_col], errors='coerce').to_numpy() / divisor
+    return out
+
+
+def lots_from_portfolio(df, as_of=None):
+    # Portfolio exports carry a holding period in days rather than a buy date
+    as_of = pd.Timestamp.today().normalize() if as_of is None else pd.Timestamp(as_of)
+    days = pd.to_numeric(df['holding period'], errors='coerce')
+    return df.assign(**{'Buy Date': as_of - pd.to_timedelta(days, unit='D')})
@@ -0,0 +1,83 @@
+import numpy as np
+import pandas as pd
+
+# -----------------------------
+# CORPORATE ACTION CLASSIFIER
+# -----------------------------
+# One compiled alternation is run over PURPOSE (extractall) and every match is
+# turned into per-row flags, so a row that is both BONUS and SPLIT carries
+# both. Bonus, split and rights ratios are parsed into numeric columns.
+
+ACTION_PATTERN = (
+    r"(?P<Rights>RIGHT)"
+    r"|(?P<Bonus>BONUS)"
+    r"|(?P<Demerger>DEMERGER)"
+    r"|(?P<Split>FV SPLIT|FVSPLT|FACE VALUE|SPLIT)"
+)
+ACTIONS = ['Rights', 'Bonus', 'Demerger', 'Split']
+CATEGORIES = ACTIONS + ['Others']
+
+BONUS_RATIO = r"BONUS\s*(?P<new>\d+)\s*:\s*(?P<held>\d+)"
+RIGHTS_RATIO = r"RIGHTS?\s*(?P<new>\d+)\s*:\s*(?P<held>\d+)(?:.*?@\s*(?P<premium>PREMIUM\s*(?:OF\s*)?)?(?:RS|RE)?\.?\s*(?P<price>\d+(?:\.\d+)?))?"
+FACE_VALUE_COLUMNS = ['FACE_VALUE', 'FACE_VAL']
+SPLIT_RATIO = r"(?:RS|RE)\.?\s*(?P<old>\d+(?:\.\d+)?)\D*?(?:TO|-)\s*(?:RS|RE)\.?\s*(?P<new>\d+(?:\.\d+)?)"
+
+
+def _ratio(purpose, pattern):
+    parts = purpose.str.extract(pattern)
+    return parts.apply(pd.to_numeric, errors='coerce')
+
+
+def classify_actions(df):
+    # df: BC rows with a PURPOSE column. Returns a new frame with Is <Action>
+    # flags, a primary Category and parsed ratio columns.
+    out = df.copy()
+    purpose = out['PURPOSE'].astype(str).str.upper().str.strip()
+    out['PURPOSE'] = purpose
+
+    matches = purpose.str.extractall(ACTION_PATTERN)
+    flags = matches.notna().groupby(level=0).any().reindex(out.index, fill_value=False)
+    for action in ACTIONS:
+        out[f'Is {action}'] = flags[action].astype(bool)
+
+    is_any = flags[ACTIONS].any(axis=1)
+    out['Category'] = pd.Categorical(
+        np.select([flags[a] for a in ACTIONS] + [~is_any], CATEGORIES, 'Others'),
+        categories=CATEGORIES
+    )
+    out['Multi Action'] = flags[ACTIONS].sum(axis=1) > 1
+
+    bonus = _ratio(purpose, BONUS_RATIO)
+    out['Bonus New'] = bonus['new']
+    out['Bonus Held'] = bonus['held']
+
+    rights = purpose.str.extract(RIGHTS_RATIO)
+    is_premium = rights['premium'].notna()
+    amount = pd.to_numeric(rights['price'], errors='coerce')
+    out['Rights New'] = pd.to_numeric(rights['new'], errors='coerce')
+    out['Rights Held'] = pd.to_numeric(rights['held'], errors='coerce')
+    # "@ PREMIUM RS 95" quotes only the premium; the issue price is face value
+    # plus premium, so it is left blank unless the file carries a face value.
+    out['Rights Premium'] = amount.where(is_premium)
+    face_value = next((out[c] for c in FACE_VALUE_COLUMNS if c in out.columns), None)
+    issue_price = amount.where(~is_premium)
+    if face_value is not None:
+        issue_price = issue_price.fillna(pd.to_numeric(face_value, errors='coerce') + out['Rights Premium'])
+    out['Rights Price'] = issue_price
+
+    split = _ratio(purpose.where(out['Is Split']), SPLIT_RATIO)
+    out['FV Old'] = split['old']
+    out['FV New'] = split['new']
+
+    # Shares held after the action per share held before (bonus x split)
+    bonus_factor = ((out['Bonus New'] + out['Bonus Held']) / out['Bonus Held']).fillna(1.0)
+    split_factor = (out['FV Old'] / out['FV New']).fillna(1.0)
+    out['Quantity Factor'] = bonus_factor * split_factor
+    return out
+
+
+def action_view(classified, category):
+    # Rows for one tab; multi-label rows appear under every action they carry
+    if category == 'Others':
+        return classified[classified['Category'] == 'Others']
+    return classified[classified[f'Is {category}']]
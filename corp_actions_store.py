@@ -0,0 +1,240 @@
+import glob
+import io
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+from cache_utils import LRUCache, file_hash
+from corp_actions import classify_actions
+
+# -----------------------------
+# CORPORATE ACTIONS ARCHIVE
+# -----------------------------
+# Months of bcddmmyy.csv files are parsed on a thread pool (one file per
+# worker; the files are small, so processes would cost more than they save),
+# classified, and merged into a local SQLite archive. Rows are deduplicated on
+# (symbol, purpose, record date) and whole files are skipped by content hash.
+# Classified frames are also kept in memory by content hash for display.
+
+STORE_PATH = "corp_actions.sqlite3"
+PARSED_ENTRIES = 64
+
+COLUMNS = {
+    'SYMBOL': 'symbol',
+    'SERIES': 'series',
+    'SECURITY': 'security',
+    'PURPOSE': 'purpose',
+    'RECORD_DT': 'record_date',
+    'EX_DT': 'ex_date',
+    'BC_STRT_DT': 'bc_start',
+    'BC_END_DT': 'bc_end',
+    'Category': 'category',
+    'Is Rights': 'is_rights',
+    'Is Bonus': 'is_bonus',
+    'Is Demerger': 'is_demerger',
+    'Is Split': 'is_split',
+    'Bonus New': 'bonus_new',
+    'Bonus Held': 'bonus_held',
+    'Rights New': 'rights_new',
+    'Rights Held': 'rights_held',
+    'Rights Price': 'rights_price',
+    'Rights Premium': 'rights_premium',
+    'FV Old': 'fv_old',
+    'FV New': 'fv_new',
+    'Quantity Factor': 'quantity_factor',
+}
+DATE_COLUMNS = ['RECORD_DT', 'EX_DT', 'BC_STRT_DT', 'BC_END_DT']
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    file_hash TEXT PRIMARY KEY,
+    filename TEXT,
+    rows INTEGER,
+    ingested_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS actions (
+    symbol TEXT NOT NULL,
+    series TEXT,
+    security TEXT,
+    purpose TEXT NOT NULL,
+    record_date TEXT NOT NULL,
+    ex_date TEXT,
+    bc_start TEXT,
+    bc_end TEXT,
+    category TEXT,
+    is_rights INTEGER,
+    is_bonus INTEGER,
+    is_demerger INTEGER,
+    is_split INTEGER,
+    bonus_new REAL,
+    bonus_held REAL,
+    rights_new REAL,
+    rights_held REAL,
+    rights_price REAL,
+    rights_premium REAL,
+    fv_old REAL,
+    fv_new REAL,
+    quantity_factor REAL,
+    UNIQUE (symbol, purpose, record_date)
+);
+CREATE INDEX IF NOT EXISTS idx_actions_symbol ON actions (symbol, record_date);
+CREATE INDEX IF NOT EXISTS idx_actions_date ON actions (record_date, category);
+"""
+
+
+def parse_bc_file(data):
+    df = pd.read_csv(io.BytesIO(data), dtype=str)
+    df.columns = df.columns.str.strip()
+    for col in df.columns:
+        df[col] = df[col].str.strip()
+
+    for col in DATE_COLUMNS:
+        if col in df.columns:
+            df[col] = pd.to_datetime(df[col], dayfirst=True, errors='coerce', format='mixed').dt.strftime('%Y-%m-%d')
+
+    # Dedupe key needs a record date; fall back to book closure start
+    record = df['RECORD_DT'] if 'RECORD_DT' in df.columns else pd.Series(None, index=df.index)
+    if 'BC_STRT_DT' in df.columns:
+        record = record.fillna(df['BC_STRT_DT'])
+    df['RECORD_DT'] = record.fillna('')
+
+    return classify_actions(df)
+
+
+def _to_rows(classified):
+    rows = classified.reindex(columns=list(COLUMNS)).rename(columns=COLUMNS)
+    rows['category'] = rows['category'].astype(str)
+    for col in ['is_rights', 'is_bonus', 'is_demerger', 'is_split']:
+        rows[col] = rows[col].astype(int)
+    return rows.astype(object).where(rows.notna(), None)
+
+
+class CorpActionStore:
+
+    def __init__(self, path=STORE_PATH, parsed_entries=PARSED_ENTRIES):
+        self._lock = threading.Lock()
+        self._parsed = LRUCache(parsed_entries)  # classified frames by content hash
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.executescript(SCHEMA)
+        self._db.commit()
+
+    def known_hashes(self):
+        with self._lock:
+            return {row[0] for row in self._db.execute("SELECT file_hash FROM files")}
+
+    def ingest(self, files, max_workers=None):
+        # files: list of (filename, bytes). Returns {filename: status}, where
+        # status is "skipped", "error: ..." or the number of new action rows.
+        known = self.known_hashes()
+        status = {}
+        pending = []
+        for filename, data in files:
+            digest = file_hash(data)
+            if digest in known:
+                status[filename] = "skipped"
+            else:
+                known.add(digest)
+                pending.append((filename, data, digest))
+
+        loaded = self.load([(filename, data) for filename, data, _ in pending], max_workers)
+        for filename, _, digest in pending:
+            classified, error = loaded[filename]
+            if error is not None:
+                status[filename] = f"error: {error}"
+                continue
+            rows = _to_rows(classified)
+            with self._lock, self._db:
+                before = self._db.total_changes
+                self._db.executemany(
+                    f"INSERT OR IGNORE INTO actions ({', '.join(rows.columns)}) "
+                    f"VALUES ({', '.join('?' * len(rows.columns))})",
+                    rows.itertuples(index=False, name=None),
+                )
+                added = self._db.total_changes - before
+                self._db.execute(
+                    "INSERT INTO files (file_hash, filename, rows, ingested_at) VALUES (?, ?, ?, ?)",
+                    (digest, filename, len(rows), time.time()),
+                )
+            status[filename] = added
+        return status
+
+    def load(self, files, max_workers=None):
+        # files: list of (filename, bytes). Returns {filename: (classified, error)};
+        # only content not seen before is parsed, on a thread pool.
+        results = {}
+        pending = []
+        for filename, data in files:
+            digest = file_hash(data)
+            classified = self._parsed.get(digest)
+            if classified is not None:
+                results[filename] = (classified, None)
+            else:
+                pending.append((filename, data, digest))
+
+        if len(pending) > 1:
+            with ThreadPoolExecutor(max_workers=max_workers) as pool:
+                parsed = list(pool.map(_safe_parse, [data for _, data, _ in pending]))
+        else:
+            parsed = [_safe_parse(data) for _, data, _ in pending]
+
+        for (filename, _, digest), (classified, error) in zip(pending, parsed):
+            if error is None:
+                self._parsed.put(digest, classified)
+            results[filename] = (classified, error)
+        return results
+
+    def ingest_folder(self, folder, pattern="*.csv", max_workers=None):
+        files = []
+        for path in sorted(glob.glob(os.path.join(folder, pattern))):
+            with open(path, "rb") as f:
+                files.append((os.path.basename(path), f.read()))
+        return self.ingest(files, max_workers)
+
+    def _query(self, sql, params=()):
+        with self._lock:
+            return pd.read_sql_query(sql, self._db, params=params)
+
+    # ---------- queries ----------
+
+    def count(self):
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM actions").fetchone()[0]
+
+    def actions_for(self, symbol):
+        return self._query(
+            "SELECT * FROM actions WHERE symbol = ? ORDER BY record_date", (symbol.strip().upper(),)
+        )
+
+    def actions_for_symbols(self, symbols):
+        symbols = sorted({str(s).strip().upper() for s in symbols})
+        if not symbols:
+            return self._query("SELECT * FROM actions WHERE 0")
+        return self._query(
+            f"SELECT * FROM actions WHERE symbol IN ({', '.join('?' * len(symbols))}) ORDER BY symbol, record_date",
+            symbols,
+        )
+
+    def actions_between(self, start, end, category=None, series="EQ"):
+        # category: one of Rights / Bonus / Demerger / Split (flag match) or Others
+        sql = "SELECT * FROM actions WHERE record_date BETWEEN ? AND ?"
+        params = [str(start), str(end)]
+        if category in ('Rights', 'Bonus', 'Demerger', 'Split'):
+            sql += f" AND is_{category.lower()} = 1"
+        elif category:
+            sql += " AND category = ?"
+            params.append(category)
+        if series:
+            sql += " AND series = ?"
+            params.append(series)
+        return self._query(sql + " ORDER BY record_date, symbol", params)
+
+
+def _safe_parse(data):
+    try:
+        return parse_bc_file(data), None
+    except Exception as e:
+        return None, e
@@ -0,0 +1,109 @@
+import re
+
+import numpy as np
+import pandas as pd
+
+from cache_utils import LRUCache
+from fund_holdings import normalize_stock
+
+# -----------------------------
+# MONTH-OVER-MONTH HOLDINGS DIFF
+# -----------------------------
+# Two disclosures of the same fund are outer-joined on the normalized stock
+# name (a hash join in pandas) to derive additions, exits and quantity /
+# weight changes directly, instead of trusting the file's own change column.
+# Diffs are cached per (fund, month pair, file contents).
+
+WEIGHT_COL = '% of Total Holding'
+QUANTITY_COLUMNS = ['Quantity', 'No of Shares', 'No. of Shares', 'Shares', 'Qty']
+
+MONTHS = "jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec"
+DAY = r"(?:0?[1-9]|[12]\d|3[01])"
+MONTH_PATTERNS = [
+    # 2024-03, 2024_03, 2024-03-31
+    (re.compile(rf"(?<!\d)(?P<year>20\d\d)[-_ ](?P<month>0?[1-9]|1[0-2])(?:[-_]{DAY})?(?!\d)"), "numeric"),
+    # 03-2024, 31-03-2024
+    (re.compile(rf"(?<!\d)(?:{DAY}[-_])?(?P<month>0?[1-9]|1[0-2])[-_ ](?P<year>20\d\d)(?!\d)"), "numeric"),
+    # Mar 2024, March-2024, Mar_2024, Mar24, 31-Mar-2024 ("_" counts as a
+    # word character, so a letter lookbehind is used instead of \b). A day is
+    # only taken when joined by "-" or "_", so "Sensex 30 Mar 2024" keeps 30.
+    (re.compile(
+        rf"(?<![A-Za-z])(?:(?<!\d){DAY}[-_]?)?(?P<month>(?:{MONTHS})[a-z]*)[-_ ]?(?P<year>(?:20)?\d\d)(?!\d)", re.I
+    ), "name"),
+]
+
+
+def parse_disclosure_name(name):
+    # "Parag Flexi Cap Mar 2024" -> ("Parag Flexi Cap", Period('2024-03')); month is None if absent
+    for pattern, kind in MONTH_PATTERNS:
+        match = pattern.search(name)
+        if not match:
+            continue
+        year = int(match.group("year"))
+        year = year + 2000 if year < 100 else year
+        if kind == "numeric":
+            month = int(match.group("month"))
+        else:
+            month = MONTHS.split("|").index(match.group("month")[:3].lower()) + 1
+        fund = (name[:match.start()] + name[match.end():]).strip(" -_")
+        return re.sub(r"\s+", " ", fund), pd.Period(year=year, month=month, freq="M")
+    return name, None
+
+
+def quantity_column(df):
+    return next((col for col in QUANTITY_COLUMNS if col in df.columns), None)
+
+
+def snapshot(df):
+    qty_col = quantity_column(df)
+    snap = pd.DataFrame({
+        'Stock': normalize_stock(df['Invested In']),
+        'Name': df['Invested In'].astype(str),
+        'Quantity': pd.to_numeric(df[qty_col], errors='coerce') if qty_col else np.nan,
+        'Weight': pd.to_numeric(df[WEIGHT_COL], errors='coerce') if WEIGHT_COL in df.columns else np.nan,
+    })
+    grouped = snap.groupby('Stock', sort=False)
+    out = grouped[['Quantity', 'Weight']].sum(min_count=1)
+    out.insert(0, 'Name', grouped['Name'].first())
+    return out
+
+
+def diff_holdings(prev_df, curr_df):
+    prev, curr = snapshot(prev_df), snapshot(curr_df)
+    diff = prev.join(curr, how='outer', lsuffix=' Prev', rsuffix=' Curr')
+
+    in_prev = diff.index.isin(prev.index)
+    in_curr = diff.index.isin(curr.index)
+    diff['Name'] = diff['Name Curr'].fillna(diff['Name Prev'])
+
+    qty_prev = diff['Quantity Prev'].where(in_prev, 0.0)
+    qty_curr = diff['Quantity Curr'].where(in_curr, 0.0)
+    diff['Quantity Change'] = qty_curr - qty_prev
+    diff['Quantity Change %'] = np.where(qty_prev > 0, diff['Quantity Change'] / qty_prev * 100, np.nan)
+    diff['Weight Change'] = diff['Weight Curr'].where(in_curr, 0.0) - diff['Weight Prev'].where(in_prev, 0.0)
+
+    # Quantity drives increased/reduced when present, otherwise weight
+    change = diff['Quantity Change'].fillna(diff['Weight Change'])
+    diff['Status'] = pd.Categorical(
+        np.select(
+            [~in_prev, ~in_curr, change > 0, change < 0],
+            ['new', 'exit', 'increased', 'reduced'],
+            'unchanged'
+        ),
+        categories=['new', 'exit', 'increased', 'reduced', 'unchanged']
+    )
+
+    columns = ['Name', 'Status', 'Quantity Prev', 'Quantity Curr', 'Quantity Change', 'Quantity Change %',
+               'Weight Prev', 'Weight Curr', 'Weight Change']
+    return diff[columns].reset_index()
+
+
+class DiffCache(LRUCache):
+
+    def diff(self, fund, prev_month, curr_month, prev_df, curr_df, prev_digest, curr_digest):
+        key = (fund, prev_month, curr_month, prev_digest, curr_digest)
+        result = self.get(key)
+        if result is None:
+            result = diff_holdings(prev_df, curr_df)
+            self.put(key, result)
+        return result
@@ -0,0 +1,106 @@
+import io
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from cache_utils import LRUCache, file_hash
+
+# -----------------------------
+# FUND HOLDINGS LOADING
+# -----------------------------
+# Uploaded disclosures are parsed once per distinct file content (SHA-256) and
+# kept as typed frames: text columns as categoricals, percentage columns as
+# floats. Several files are parsed concurrently.
+
+CHANGE_COL = 'Month Change <br> in Shares %'
+CHANGE_PCT_COL = 'Change %'
+CHANGE_STATUS_COL = 'Change Status'
+CHANGE_STATUSES = ['new', 'exit', 'changed', 'unchanged']
+REQUIRED_COLUMNS = ['Invested In', CHANGE_COL]
+PERCENT_COLUMNS = ['% of Total Holding']
+
+
+def fund_name_from_file(filename):
+    return filename.replace(".csv", "").replace(".xlsx", "")
+
+
+def normalize_stock(names):
+    # Canonical stock key: upper case, no punctuation or "LTD"/"LIMITED" suffix
+    return (
+        names.astype(str).str.upper()
+        .str.replace(r'[^A-Z0-9& ]', ' ', regex=True)
+        .str.replace(r'\s+(LTD|LIMITED)\s*$', '', regex=True)
+        .str.split().str.join(' ')
+    )
+
+
+def normalize_change(df):
+    # Split the free-text change column ("12.5", "+3%", "New", "Exit") into a
+    # numeric percentage and a status flag, once, with vectorized string ops.
+    text = df[CHANGE_COL].str.strip().str.lower()
+    pct = pd.to_numeric(text.str.extract(r'^([+-]?\d+(?:\.\d+)?)', expand=False), errors='coerce')
+
+    is_new = text.str.contains('new', na=False)
+    is_exit = text.str.contains('exit', na=False) | (pct <= -100)
+    status = np.select(
+        [is_new, is_exit, pct.notna() & (pct != 0)],
+        ['new', 'exit', 'changed'],
+        'unchanged'
+    )
+
+    df[CHANGE_PCT_COL] = pct.mask(is_exit & pct.isna(), -100.0)
+    df[CHANGE_STATUS_COL] = pd.Categorical(status, categories=CHANGE_STATUSES)
+    return df
+
+
+def to_columnar(df):
+    df = df.copy()
+    for col in PERCENT_COLUMNS:
+        if col in df.columns and not pd.api.types.is_numeric_dtype(df[col]):
+            df[col] = pd.to_numeric(df[col].astype(str).str.rstrip('%').str.strip(), errors='coerce')
+    for col in df.columns:
+        if col != CHANGE_COL and (pd.api.types.is_object_dtype(df[col]) or pd.api.types.is_string_dtype(df[col])):
+            df[col] = df[col].astype('category')
+    df[CHANGE_COL] = df[CHANGE_COL].astype(str)
+    return normalize_change(df)
+
+
+def parse_holdings(filename, data):
+    buf = io.BytesIO(data)
+    df = pd.read_csv(buf) if filename.endswith(".csv") else pd.read_excel(buf)
+    missing = [col for col in REQUIRED_COLUMNS if col not in df.columns]
+    if missing:
+        raise ValueError(f"'{filename}' missing required columns.")
+    return to_columnar(df)
+
+
+class HoldingsCache(LRUCache):
+    # Parsed frames keyed by content hash, shared across sessions
+
+    def load(self, files, max_workers=4):
+        # files: list of (filename, bytes). Returns {filename: (df, error)};
+        # only content not seen before is parsed, on a thread pool.
+        results = {}
+        to_parse = []
+        for filename, data in files:
+            digest = file_hash(data)
+            df = self.get(digest)
+            if df is not None:
+                results[filename] = (df, None)
+            else:
+                to_parse.append((filename, data, digest))
+
+        def parse(item):
+            filename, data, digest = item
+            try:
+                df = parse_holdings(filename, data)
+            except Exception as e:
+                return filename, (None, e)
+            self.put(digest, df)
+            return filename, (df, None)
+
+        if to_parse:
+            with ThreadPoolExecutor(max_workers=max_workers) as pool:
+                results.update(pool.map(parse, to_parse))
+        return results
@@ -0,0 +1,72 @@
+import numpy as np
+import pandas as pd
+
+from fund_holdings import normalize_stock
+
+# -----------------------------
+# CROSS-FUND OVERLAP
+# -----------------------------
+# All loaded funds are stacked into one long (fund, stock, weight) table with
+# categorical keys, then pivoted into a fund x stock weight matrix. Pairwise
+# overlap comes from matrix products / broadcast minimums over that matrix,
+# not from looping over fund pairs.
+
+WEIGHT_COL = '% of Total Holding'
+
+
+def stack_funds(funds_data):
+    frames = []
+    for fund, df in funds_data.items():
+        weight = df[WEIGHT_COL] if WEIGHT_COL in df.columns else np.nan
+        frames.append(pd.DataFrame({
+            'Fund': fund,
+            'Stock': normalize_stock(df['Invested In']),
+            'Weight': pd.to_numeric(weight, errors='coerce'),
+        }))
+    if not frames:
+        return pd.DataFrame(columns=['Fund', 'Stock', 'Weight'])
+
+    long = pd.concat(frames, ignore_index=True)
+    long = long.groupby(['Fund', 'Stock'], as_index=False, sort=False)['Weight'].sum(min_count=1)
+    long['Fund'] = long['Fund'].astype('category')
+    long['Stock'] = long['Stock'].astype('category')
+    return long
+
+
+def weight_matrix(long):
+    # funds x stocks, 0 where a fund does not hold the stock
+    return long.pivot_table(
+        index='Fund', columns='Stock', values='Weight', aggfunc='sum', fill_value=0.0, observed=True
+    )
+
+
+def overlap_matrices(long, chunk_size=16):
+    # Returns (common stock counts, weight overlap = sum of min(weight_i, weight_j))
+    matrix = weight_matrix(long)
+    funds = matrix.index
+    held = long.assign(Held=1).pivot_table(
+        index='Fund', columns='Stock', values='Held', aggfunc='max', fill_value=0, observed=True
+    ).reindex(index=funds, columns=matrix.columns, fill_value=0).to_numpy()
+
+    common = held @ held.T
+
+    w = matrix.to_numpy()
+    overlap = np.empty((len(funds), len(funds)))
+    # Chunked so the broadcast stays at chunk x funds x stocks floats
+    for start in range(0, len(funds), chunk_size):
+        block = w[start:start + chunk_size]
+        overlap[start:start + chunk_size] = np.minimum(block[:, None, :], w[None, :, :]).sum(axis=2)
+
+    return (
+        pd.DataFrame(common, index=funds, columns=funds),
+        pd.DataFrame(overlap, index=funds, columns=funds),
+    )
+
+
+def widely_held(long, top=20):
+    summary = long.groupby('Stock', observed=True).agg(
+        Funds=('Fund', 'nunique'),
+        AvgWeight=('Weight', 'mean'),
+        TotalWeight=('Weight', 'sum'),
+    ).reset_index()
+    return summary.sort_values(['Funds', 'TotalWeight'], ascending=False).head(top).reset_index(drop=True)
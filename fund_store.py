@@ -0,0 +1,154 @@
+import sqlite3
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from fund_diff import quantity_column
+from fund_holdings import CHANGE_PCT_COL, CHANGE_STATUS_COL, normalize_stock
+
+# -----------------------------
+# FUND DISCLOSURE HISTORY
+# -----------------------------
+# Every uploaded disclosure (fund, month, holdings) is appended to a local
+# SQLite store indexed on fund, month and stock, so history queries work
+# without re-uploading. Files are keyed by content hash and skipped when
+# already ingested; a different file for the same fund and month replaces
+# the earlier one.
+
+STORE_PATH = "fund_history.sqlite3"
+WEIGHT_COL = '% of Total Holding'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS disclosures (
+    file_hash TEXT PRIMARY KEY,
+    fund TEXT NOT NULL,
+    month TEXT NOT NULL,
+    filename TEXT,
+    ingested_at REAL NOT NULL
+);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_disclosures_fund_month ON disclosures (fund, month);
+
+CREATE TABLE IF NOT EXISTS holdings (
+    file_hash TEXT NOT NULL,
+    fund TEXT NOT NULL,
+    month TEXT NOT NULL,
+    stock TEXT NOT NULL,
+    name TEXT,
+    sector TEXT,
+    weight REAL,
+    quantity REAL,
+    change_pct REAL,
+    change_status TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_holdings_fund_month ON holdings (fund, month);
+CREATE INDEX IF NOT EXISTS idx_holdings_stock ON holdings (stock, fund, month);
+CREATE INDEX IF NOT EXISTS idx_holdings_file ON holdings (file_hash);
+"""
+
+
+def _column(df, name, numeric=False):
+    if name is None or name not in df.columns:
+        return pd.Series(np.nan if numeric else None, index=df.index)
+    if numeric:
+        return pd.to_numeric(df[name], errors='coerce')
+    values = df[name].astype(object)
+    return values.where(values.notna(), None).map(lambda v: v if v is None else str(v))
+
+
+class FundStore:
+
+    def __init__(self, path=STORE_PATH):
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.executescript(SCHEMA)
+        self._db.commit()
+
+    def has(self, file_hash):
+        with self._lock:
+            return self._db.execute(
+                "SELECT 1 FROM disclosures WHERE file_hash = ?", (file_hash,)
+            ).fetchone() is not None
+
+    def ingest(self, fund, month, df, file_hash, filename=None):
+        # Returns False if this exact file was already ingested
+        month = str(month)
+        if self.has(file_hash):
+            return False
+
+        df = df[df['Invested In'].notna()]
+        qty_col = quantity_column(df)
+        rows = pd.DataFrame({
+            'file_hash': file_hash,
+            'fund': fund,
+            'month': month,
+            'stock': normalize_stock(df['Invested In']),
+            'name': _column(df, 'Invested In'),
+            'sector': _column(df, 'Sector'),
+            'weight': _column(df, WEIGHT_COL, numeric=True),
+            'quantity': _column(df, qty_col, numeric=True),
+            'change_pct': _column(df, CHANGE_PCT_COL, numeric=True),
+            'change_status': _column(df, CHANGE_STATUS_COL),
+        })
+        rows = rows.astype(object).where(rows.notna(), None)
+
+        with self._lock, self._db:
+            old = self._db.execute(
+                "SELECT file_hash FROM disclosures WHERE fund = ? AND month = ?", (fund, month)
+            ).fetchone()
+            if old:
+                self._db.execute("DELETE FROM holdings WHERE file_hash = ?", old)
+                self._db.execute("DELETE FROM disclosures WHERE file_hash = ?", old)
+            self._db.execute(
+                "INSERT INTO disclosures (file_hash, fund, month, filename, ingested_at) VALUES (?, ?, ?, ?, ?)",
+                (file_hash, fund, month, filename, time.time()),
+            )
+            self._db.executemany(
+                f"INSERT INTO holdings ({', '.join(rows.columns)}) VALUES ({', '.join('?' * len(rows.columns))})",
+                rows.itertuples(index=False, name=None),
+            )
+        return True
+
+    def _query(self, sql, params=()):
+        with self._lock:
+            return pd.read_sql_query(sql, self._db, params=params)
+
+    # ---------- history queries ----------
+
+    def disclosures(self):
+        return self._query("SELECT fund, month, filename FROM disclosures ORDER BY fund, month")
+
+    def funds(self):
+        return self._query("SELECT DISTINCT fund FROM disclosures ORDER BY fund")['fund'].tolist()
+
+    def stocks(self, fund):
+        return self._query(
+            "SELECT DISTINCT stock FROM holdings WHERE fund = ? ORDER BY stock", (fund,)
+        )['stock'].tolist()
+
+    def first_bought(self, fund, stock):
+        # Earliest month the fund held the stock, or None
+        result = self._query(
+            "SELECT MIN(month) AS month FROM holdings WHERE fund = ? AND stock = ?", (fund, stock)
+        )
+        return result['month'].iloc[0]
+
+    def stock_history(self, fund, stock):
+        return self._query(
+            "SELECT month, weight, quantity, change_status FROM holdings "
+            "WHERE fund = ? AND stock = ? ORDER BY month",
+            (fund, stock),
+        )
+
+    def sector_trend(self, fund, months=24):
+        # month x sector weight table for the fund's last `months` disclosures
+        trend = self._query(
+            "SELECT h.month, COALESCE(h.sector, 'Unknown') AS sector, SUM(h.weight) AS weight "
+            "FROM holdings h "
+            "JOIN (SELECT month FROM disclosures WHERE fund = ? ORDER BY month DESC LIMIT ?) recent "
+            "ON h.month = recent.month "
+            "WHERE h.fund = ? GROUP BY h.month, sector",
+            (fund, months, fund),
+        )
+        return trend.pivot(index='month', columns='sector', values='weight').fillna(0.0).sort_index()
@@ -0,0 +1,150 @@
+import json
+import os
+import re
+import threading
+import time
+
+# -----------------------------
+# LOCAL ISBN INDEX
+# -----------------------------
+# Keeps a copy of the library sheet (header + rows) and an ISBN -> sheet row
+# map, persisted to disk. Only rows past the last known one are fetched from
+# the sheet, by range, so adds and reruns never download the whole sheet.
+
+INDEX_PATH = "isbn_index.json"
+LAST_COLUMN = "I"
+
+
+class IsbnIndex:
+
+    def __init__(self, sheet, path=INDEX_PATH, sync_interval=30.0):
+        self.sheet = sheet
+        self.path = path
+        self.sync_interval = sync_interval
+
+        self._lock = threading.RLock()
+        self._last_sync = 0.0
+        self.header = []
+        self.rows = []
+        self.isbn_rows = {}
+        self._listeners = []
+
+        self._load()
+        self.sync(force=True)
+
+    # ---------- persistence ----------
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get("sheet_id") != self._sheet_id():
+            return
+        self.header = data["header"]
+        self.rows = data["rows"]
+        self._reindex()
+
+    def _save(self):
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w") as f:
+            json.dump({"sheet_id": self._sheet_id(), "header": self.header, "rows": self.rows}, f)
+        os.replace(tmp, self.path)
+
+    def _sheet_id(self):
+        return getattr(getattr(self.sheet, "spreadsheet", None), "id", None)
+
+    # ---------- indexing ----------
+
+    def _isbn_col(self):
+        return self.header.index("ISBN") if "ISBN" in self.header else 1
+
+    def _reindex(self):
+        col = self._isbn_col()
+        self.isbn_rows = {
+            str(row[col]).strip(): i + 2  # +1 for the header, +1 for 1-based rows
+            for i, row in enumerate(self.rows)
+            if len(row) > col and not _is_blank(row)
+        }
+
+    def _append_local(self, new_rows):
+        # Blank sheet rows are kept as placeholders so that self.rows[i] is
+        # always sheet row i + 2; they are never indexed or passed on.
+        col = self._isbn_col()
+        start = len(self.rows)
+        for row in new_rows:
+            self.rows.append(row)
+            if len(row) > col and not _is_blank(row):
+                self.isbn_rows[str(row[col]).strip()] = len(self.rows) + 1
+        data_rows = [row for row in new_rows if not _is_blank(row)]
+        for listener in self._listeners:
+            listener(data_rows, start)
+
+    def on_append(self, listener):
+        # listener(new_rows, start) is called whenever rows are added to the
+        # index; start is the position of the first new row (0 after a rebuild)
+        self._listeners.append(listener)
+
+    # ---------- sheet sync ----------
+
+    def sync(self, force=False):
+        # Fetch rows appended to the sheet since the last sync (by anyone)
+        with self._lock:
+            if not force and time.time() - self._last_sync < self.sync_interval:
+                return 0
+            if not self.header:
+                self.header = self.sheet.row_values(1)
+            start = len(self.rows) + 2
+            new_rows = self.sheet.get(f"A{start}:{LAST_COLUMN}") or []
+            if new_rows:
+                self._append_local(new_rows)
+                self._save()
+            self._last_sync = time.time()
+            return len(new_rows)
+
+    def rebuild(self):
+        # Full reload, for when rows were edited or deleted in the sheet itself
+        with self._lock:
+            self.header = []
+            self.rows = []
+            self.isbn_rows = {}
+            if not self.sync(force=True):
+                self._append_local([])  # still tell listeners to reset
+            self._save()
+
+    # ---------- queries ----------
+
+    def contains(self, isbn):
+        with self._lock:
+            return str(isbn).strip() in self.isbn_rows
+
+    def add(self, row, response=None):
+        self.add_rows([row], response)
+
+    def add_rows(self, rows, response=None):
+        # Record rows that were just appended to the sheet. response is the
+        # append_row(s)() result; if the sheet placed them somewhere other than
+        # right after our last known row, someone else appended too, so resync.
+        with self._lock:
+            expected = len(self.rows) + 2
+            updated = (response or {}).get("updates", {}).get("updatedRange", "")
+            match = re.search(r"![A-Z]+(\d+)", updated)
+            if match and int(match.group(1)) != expected:
+                self.sync(force=True)
+                return
+            self._append_local([[str(cell) for cell in row] for row in rows])
+            self._save()
+
+    def to_record(self, row):
+        return dict(zip(self.header, row + [""] * (len(self.header) - len(row))))
+
+    def records(self):
+        with self._lock:
+            return [self.to_record(row) for row in self.rows if not _is_blank(row)]
+
+
+def _is_blank(row):
+    return all(str(cell).strip() == "" for cell in row)
@@ -0,0 +1,104 @@
+import bisect
+import re
+import threading
+from collections import defaultdict
+
+# -----------------------------
+# LIBRARY SEARCH INDEX
+# -----------------------------
+# In-memory inverted index over title, authors and publisher. Each query term
+# matches whole tokens or, at a lower weight, any token it is a prefix of
+# (looked up by bisecting a sorted token list). All terms must match; results
+# are ranked by summed field weights and returned a page at a time.
+
+FIELD_WEIGHTS = {"title": 3.0, "authors": 2.0, "publisher": 1.0}
+PREFIX_WEIGHT = 0.5
+
+
+def tokenize(text):
+    return re.findall(r"\w+", str(text).lower())
+
+
+class LibrarySearch:
+
+    def __init__(self, field_weights=FIELD_WEIGHTS):
+        self.field_weights = field_weights
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.records = []
+        self.postings = defaultdict(dict)  # token -> {doc_id: weight}
+        self.tokens = []  # sorted, for prefix lookups
+
+    @classmethod
+    def attach(cls, isbn_index, **kwargs):
+        # Build from an IsbnIndex and follow its appends incrementally
+        search = cls(**kwargs)
+        search.add(isbn_index.records())
+        isbn_index.on_append(
+            lambda rows, start: search.add([isbn_index.to_record(row) for row in rows], start)
+        )
+        return search
+
+    def _fields(self, record):
+        # Sheet headers may differ in case ("Title" / "title")
+        lowered = {str(k).strip().lower(): v for k, v in record.items()}
+        return {field: lowered.get(field, "") for field in self.field_weights}
+
+    def add(self, records, start=None):
+        with self._lock:
+            if start == 0:
+                self.reset()
+            new_tokens = []
+            for record in records:
+                doc_id = len(self.records)
+                self.records.append(record)
+                for field, text in self._fields(record).items():
+                    weight = self.field_weights[field]
+                    for token in tokenize(text):
+                        docs = self.postings[token]
+                        if not docs:
+                            new_tokens.append(token)
+                        docs[doc_id] = docs.get(doc_id, 0.0) + weight
+
+            # Single adds insort; bulk loads merge with one sort
+            if len(new_tokens) > 64:
+                self.tokens = sorted(self.tokens + new_tokens)
+            else:
+                for token in new_tokens:
+                    bisect.insort(self.tokens, token)
+
+    def _term_scores(self, term):
+        scores = dict(self.postings.get(term, {}))
+        i = bisect.bisect_left(self.tokens, term)
+        while i < len(self.tokens) and self.tokens[i].startswith(term):
+            token = self.tokens[i]
+            if token != term:
+                for doc_id, weight in self.postings[token].items():
+                    scores[doc_id] = max(scores.get(doc_id, 0.0), weight * PREFIX_WEIGHT)
+            i += 1
+        return scores
+
+    def search(self, query, page=1, per_page=25):
+        # Returns (total matches, records on the requested page)
+        terms = tokenize(query)
+        with self._lock:
+            if not terms:
+                total = len(self.records)
+                start = (page - 1) * per_page
+                return total, self.records[::-1][start:start + per_page]
+
+            scores = None
+            for term in terms:
+                term_scores = self._term_scores(term)
+                if scores is None:
+                    scores = term_scores
+                else:
+                    scores = {d: s + term_scores[d] for d, s in scores.items() if d in term_scores}
+                if not scores:
+                    return 0, []
+
+            ranked = sorted(scores, key=lambda d: (-scores[d], -d))
+            start = (page - 1) * per_page
+            return len(ranked), [self.records[d] for d in ranked[start:start + per_page]]
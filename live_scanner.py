@@ -0,0 +1,113 @@
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import av
+import cv2
+from streamlit_webrtc import VideoProcessorBase
+
+from barcode_decode import decode_isbns_from_array
+
+# -----------------------------
+# LIVE ISBN SCANNER
+# -----------------------------
+# Video frames arrive on the webrtc thread. Each frame is cropped to a region
+# of interest and handed to a single decode worker; frames that arrive while a
+# decode is still running are dropped, so decoding never queues up behind the
+# camera. Repeated reads of the same ISBN are debounced.
+
+ROI_WIDTH = 0.7   # fraction of the frame, centred
+ROI_HEIGHT = 0.4
+DECODE_SIDE = 640
+DEBOUNCE_SECONDS = 3.0
+HISTORY_SIZE = 200
+
+
+class IsbnScanner(VideoProcessorBase):
+
+    def __init__(self, roi_width=ROI_WIDTH, roi_height=ROI_HEIGHT,
+                 decode_side=DECODE_SIDE, debounce=DEBOUNCE_SECONDS, history_size=HISTORY_SIZE):
+        self.roi_width = roi_width
+        self.roi_height = roi_height
+        self.decode_side = decode_side
+        self.debounce = debounce
+
+        self._lock = threading.Lock()
+        self._worker = ThreadPoolExecutor(max_workers=1)
+        self._busy = False
+
+        self.last_isbn = None
+        self._last_seen = {}
+        self.history = deque(maxlen=history_size)
+
+        self.frames = 0
+        self.dropped = 0
+        self.decodes = 0
+        self.last_latency_ms = None
+        self.avg_latency_ms = None
+
+    def _roi(self, image):
+        h, w = image.shape[:2]
+        rw, rh = int(w * self.roi_width), int(h * self.roi_height)
+        x, y = (w - rw) // 2, (h - rh) // 2
+        return x, y, rw, rh
+
+    def _decode(self, roi):
+        start = time.perf_counter()
+        try:
+            isbns = decode_isbns_from_array(roi, self.decode_side, retry_full=False)
+        finally:
+            latency = (time.perf_counter() - start) * 1000
+            with self._lock:
+                self._busy = False
+                self.decodes += 1
+                self.last_latency_ms = latency
+                self.avg_latency_ms = (
+                    latency if self.avg_latency_ms is None
+                    else 0.9 * self.avg_latency_ms + 0.1 * latency
+                )
+
+        now = time.monotonic()
+        with self._lock:
+            # Entries older than the debounce window no longer suppress anything
+            stale = [isbn for isbn, seen in self._last_seen.items() if now - seen >= self.debounce]
+            for isbn in stale:
+                del self._last_seen[isbn]
+            for isbn in isbns:
+                if now - self._last_seen.get(isbn, float("-inf")) >= self.debounce:
+                    self.last_isbn = isbn
+                    self.history.append(isbn)
+                self._last_seen[isbn] = now
+
+    def recv(self, frame):
+        image = frame.to_ndarray(format="bgr24")
+        x, y, rw, rh = self._roi(image)
+
+        with self._lock:
+            self.frames += 1
+            submit = not self._busy
+            if submit:
+                self._busy = True
+            else:
+                self.dropped += 1
+
+        if submit:
+            self._worker.submit(self._decode, image[y:y + rh, x:x + rw].copy())
+
+        cv2.rectangle(image, (x, y), (x + rw, y + rh), (0, 255, 0), 2)
+        return av.VideoFrame.from_ndarray(image, format="bgr24")
+
+    def stats(self):
+        with self._lock:
+            return {
+                "frames": self.frames,
+                "dropped": self.dropped,
+                "decodes": self.decodes,
+                "last_latency_ms": self.last_latency_ms,
+                "avg_latency_ms": self.avg_latency_ms,
+                "last_isbn": self.last_isbn,
+            }
+
+    def on_ended(self):
+        self._worker.shutdown(wait=False)
@@ -1,5 +1,15 @@
 import streamlit as st
-import pandas as pd
+from cache_utils import file_hash
+from fund_holdings import (
+    CHANGE_COL,
+    CHANGE_PCT_COL,
+    CHANGE_STATUS_COL,
+    HoldingsCache,
+    fund_name_from_file,
+)
+from fund_diff import DiffCache, parse_disclosure_name
+from fund_store import FundStore
+from fund_overlap import overlap_matrices, stack_funds, widely_held
 
 st.set_page_config(page_title="Multi-MF Analyzer", layout="wide")
 st.title("📊 Mutual Fund Multi-File Analyzer")
@@ -10,23 +20,143 @@ uploaded_files = st.file_uploader(
     accept_multiple_files=True
 )
 
+
+# Parsed frames keyed by file content, shared across reruns and sessions
+@st.cache_resource
+def get_holdings_cache():
+    return HoldingsCache()
+
+
+# Month-over-month diffs keyed by (fund, month pair, file contents)
+@st.cache_resource
+def get_diff_cache():
+    return DiffCache()
+
+
+# Local disclosure history, appended to on every upload
+@st.cache_resource
+def get_fund_store():
+    return FundStore()
+
+
+fund_store = get_fund_store()
 funds_data = {}
+digests = {}
 
 if uploaded_files:
-    for file in uploaded_files:
-        filename = file.name
-        try:
-            df = pd.read_csv(file) if filename.endswith(".csv") else pd.read_excel(file)
-            if 'Invested In' not in df.columns or 'Month Change <br> in Shares %' not in df.columns:
-                st.warning(f"'{filename}' missing required columns.")
-                continue
-            df['Month Change <br> in Shares %'] = df['Month Change <br> in Shares %'].astype(str)
-            fund_name = filename.replace(".csv", "").replace(".xlsx", "")
+    uploads = [(file.name, file.getvalue()) for file in uploaded_files]
+    loaded = get_holdings_cache().load(uploads)
+    for filename, data in uploads:
+        df, error = loaded[filename]
+        if isinstance(error, ValueError):
+            st.warning(str(error))
+        elif error is not None:
+            st.error(f"Error processing {filename}: {error}")
+        else:
+            fund_name = fund_name_from_file(filename)
             funds_data[fund_name] = df
-        except Exception as e:
-            st.error(f"Error processing {filename}: {e}")
+            digests[fund_name] = file_hash(data)
+
+            fund, month = parse_disclosure_name(fund_name)
+            if month is not None:
+                fund_store.ingest(fund, month, df, digests[fund_name], filename)
+            else:
+                st.caption(f"No month found in '{filename}'; it is not added to history or Month-over-Month.")
+
+# Funds uploaded for two or more months, e.g. "Parag Flexi Cap Mar 2024.xlsx"
+timelines = {}
+for fund_name in funds_data:
+    fund, month = parse_disclosure_name(fund_name)
+    if month is not None:
+        timelines.setdefault(fund, {})[month] = fund_name
+timelines = {fund: months for fund, months in timelines.items() if len(months) > 1}
+
+modes = ["Single Fund"]
+if len(funds_data) > 1:
+    modes.append("Cross-Fund Overlap")
+if timelines:
+    modes.append("Month-over-Month")
+history_funds = fund_store.funds()
+if history_funds:
+    modes.append("History")
+analysis_mode = st.radio("Mode", modes, horizontal=True) if len(modes) > 1 else "Single Fund"
+
+if analysis_mode == "History":
+    st.header("🗂️ Disclosure History")
+    selected_fund = st.selectbox("Select a Mutual Fund", history_funds)
+
+    trend_months = st.slider("Months", min_value=3, max_value=60, value=24)
+    trend = fund_store.sector_trend(selected_fund, trend_months)
+    if not trend.empty:
+        st.subheader("Sector Weight Trend")
+        st.line_chart(trend)
+
+    stock = st.selectbox("Stock", fund_store.stocks(selected_fund))
+    if stock:
+        first_month = fund_store.first_bought(selected_fund, stock)
+        st.write(f"📅 **{selected_fund}** first held **{stock}** in **{first_month}**.")
+        history = fund_store.stock_history(selected_fund, stock)
+        st.line_chart(history.set_index('month')[['weight']])
+        st.dataframe(history)
+
+    with st.expander("Stored disclosures"):
+        st.dataframe(fund_store.disclosures())
+
+elif funds_data and analysis_mode == "Month-over-Month":
+    selected_fund = st.selectbox("Select a Mutual Fund", list(timelines.keys()))
+    timeline = timelines[selected_fund]
+    months = sorted(timeline)
+    pairs = list(zip(months, months[1:]))
+    prev_month, curr_month = st.selectbox(
+        "Compare",
+        pairs,
+        index=len(pairs) - 1,
+        format_func=lambda pair: f"{pair[0].strftime('%b %Y')} → {pair[1].strftime('%b %Y')}"
+    )
+
+    prev_name, curr_name = timeline[prev_month], timeline[curr_month]
+    diff = get_diff_cache().diff(
+        selected_fund, prev_month, curr_month,
+        funds_data[prev_name], funds_data[curr_name],
+        digests[prev_name], digests[curr_name]
+    )
+
+    st.header(f"🔄 {selected_fund}: {prev_month.strftime('%b %Y')} → {curr_month.strftime('%b %Y')}")
+
+    counts = diff['Status'].value_counts()
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("New Additions", int(counts.get('new', 0)))
+    col2.metric("Exits", int(counts.get('exit', 0)))
+    col3.metric("Increased", int(counts.get('increased', 0)))
+    col4.metric("Reduced", int(counts.get('reduced', 0)))
+
+    tab_new, tab_exit, tab_up, tab_down = st.tabs(["New Additions", "Exits", "Increased", "Reduced"])
+    with tab_new:
+        st.dataframe(diff[diff['Status'] == 'new'].sort_values('Weight Curr', ascending=False))
+    with tab_exit:
+        st.dataframe(diff[diff['Status'] == 'exit'].sort_values('Weight Prev', ascending=False))
+    with tab_up:
+        st.dataframe(diff[diff['Status'] == 'increased'].nlargest(20, 'Weight Change'))
+    with tab_down:
+        st.dataframe(diff[diff['Status'] == 'reduced'].nsmallest(20, 'Weight Change'))
+
+elif funds_data and analysis_mode == "Cross-Fund Overlap":
+    st.header(f"🔗 Overlap across {len(funds_data)} funds")
+
+    holdings_long = stack_funds(funds_data)
+    common_stocks, weight_overlap = overlap_matrices(holdings_long)
+
+    st.subheader("Weighted Overlap (%)")
+    st.caption("Sum over shared stocks of the smaller of the two funds' weights.")
+    st.dataframe(weight_overlap.round(2).style.background_gradient(cmap="Blues"))
+
+    st.subheader("Common Stocks")
+    st.dataframe(common_stocks.style.background_gradient(cmap="Greens"))
+
+    st.subheader("Most Widely Held Stocks")
+    st.dataframe(widely_held(holdings_long))
 
-if funds_data:
+elif funds_data:
     selected_fund = st.selectbox("Select a Mutual Fund", list(funds_data.keys()))
     selected_view = st.selectbox("Select Analysis View", [
         "New Additions",
@@ -41,16 +171,16 @@ if funds_data:
     st.header(f"📈 Analysis for: {selected_fund} → {selected_view}")
 
     if selected_view == "New Additions":
-        new_stocks = df[df['Month Change <br> in Shares %'].str.contains('new', case=False, na=False)]
-        st.dataframe(new_stocks[["Invested In", "Sector", "Month Change <br> in Shares %"]])
+        new_stocks = df[df[CHANGE_STATUS_COL] == 'new']
+        st.dataframe(new_stocks[["Invested In", "Sector", CHANGE_COL]])
 
     elif selected_view == "Top Gainers":
-        gainers = df[df['Month Change <br> in Shares %'].str.contains('^[+]?[0-9]', na=False, regex=True)]
-        st.dataframe(gainers.sort_values(by='Month Change <br> in Shares %', ascending=False)[["Invested In", "Month Change <br> in Shares %"]].head(5))
+        gainers = df[df[CHANGE_PCT_COL] > 0].nlargest(5, CHANGE_PCT_COL)
+        st.dataframe(gainers[["Invested In", CHANGE_COL, CHANGE_PCT_COL]])
 
     elif selected_view == "Top Exits / Reductions":
-        reducers = df[df['Month Change <br> in Shares %'].str.contains('^-', na=False)]
-        st.dataframe(reducers.sort_values(by='Month Change <br> in Shares %')[["Invested In", "Month Change <br> in Shares %"]].head(5))
+        reducers = df[df[CHANGE_PCT_COL] < 0].nsmallest(5, CHANGE_PCT_COL)
+        st.dataframe(reducers[["Invested In", CHANGE_COL, CHANGE_PCT_COL, CHANGE_STATUS_COL]])
 
     elif selected_view == "Top Holdings":
         if '% of Total Holding' in df.columns:
@@ -61,7 +191,7 @@ if funds_data:
 
     elif selected_view == "Sectoral Allocation":
         if 'Sector' in df.columns and '% of Total Holding' in df.columns:
-            sector_summary = df[['Sector', '% of Total Holding']].dropna().groupby('Sector')['% of Total Holding'].sum().reset_index().sort_values(by='% of Total Holding', ascending=False)
+            sector_summary = df[['Sector', '% of Total Holding']].dropna().groupby('Sector', observed=True)['% of Total Holding'].sum().reset_index().sort_values(by='% of Total Holding', ascending=False)
             st.dataframe(sector_summary)
         else:
             st.warning("'Sector' or '% of Total Holding' column missing in the file.")
@@ -0,0 +1,106 @@
+import pandas as pd
+
+from portfolio_rules import gain_status
+
+# -----------------------------
+# MULTI-ACCOUNT CONSOLIDATION
+# -----------------------------
+# Each account's classified lots are reduced once to a per-scrip contribution
+# (additive sums, underperformance tag counts, first holding status). The
+# consolidated totals are kept alongside; when an account changes, only the
+# scrips it holds (before or after the change) are re-summed from the stored
+# contributions, so the other accounts' lots are never grouped again.
+
+ADDITIVE_COLUMNS = ['Quantity', 'Buying Quanta', 'Selling Quanta', 'Gain/Loss', '% wtge']
+TAG_PREFIX = 'tag: '
+
+
+def account_contribution(lots):
+    # lots: one account's frame after portfolio_rules classification.
+    # Returns (per-scrip sums and tag counts, per-scrip first holding status).
+    grouped = lots.groupby('ScripName', sort=False)
+    tags = pd.crosstab(lots['ScripName'], lots['UnderperformanceTag'].astype(str))
+    numeric = grouped[ADDITIVE_COLUMNS].sum().join(tags.add_prefix(TAG_PREFIX))
+    status = grouped['HoldingPeriodStatus'].first().astype(str)
+    return numeric, status
+
+
+class PortfolioConsolidator:
+
+    def __init__(self):
+        self._accounts = {}  # account -> (key, numeric, status), in upload order
+        self._numeric = pd.DataFrame(columns=ADDITIVE_COLUMNS)
+        self._status = pd.Series(dtype=object)
+
+    def accounts(self):
+        return list(self._accounts)
+
+    def sync(self, sources):
+        # sources: {account: (key, load_lots)}. load_lots() is only called for
+        # accounts that are new or whose key changed; accounts missing from
+        # sources are dropped. Returns the accounts that were recomputed.
+        for account in [a for a in self._accounts if a not in sources]:
+            self._replace(account, None)
+
+        changed = []
+        for account, (key, load_lots) in sources.items():
+            current = self._accounts.get(account)
+            if current is None or current[0] != key:
+                self._replace(account, (key, *account_contribution(load_lots())))
+                changed.append(account)
+        return changed
+
+    def _replace(self, account, contribution):
+        old = self._accounts.get(account)
+        if contribution is None:
+            del self._accounts[account]
+        else:
+            # Assigning in place keeps the account's position for "first" status
+            self._accounts[account] = contribution
+
+        affected = pd.Index([])
+        for entry in (old, contribution):
+            if entry is not None:
+                affected = affected.union(entry[1].index)
+        self._refresh(affected)
+
+    def _refresh(self, scrips):
+        numeric = [n[n.index.isin(scrips)] for _, n, _ in self._accounts.values()]
+        status = [s[s.index.isin(scrips)] for _, _, s in self._accounts.values()]
+        fresh_numeric = pd.concat(numeric).groupby(level=0).sum() if numeric else None
+        fresh_status = pd.concat(status).groupby(level=0).first() if status else None
+
+        self._numeric = pd.concat([self._numeric[~self._numeric.index.isin(scrips)], fresh_numeric])
+        self._status = pd.concat([self._status[~self._status.index.isin(scrips)], fresh_status])
+
+    def consolidated(self):
+        # Same columns as a single-file group-by on ScripName. With several
+        # accounts, % wtge is each scrip's share of the combined current value.
+        numeric = self._numeric.fillna(0.0).sort_index()
+        out = numeric[ADDITIVE_COLUMNS].astype(float)
+        if len(self._accounts) > 1:
+            out['% wtge'] = out['Selling Quanta'] / out['Selling Quanta'].sum() * 100
+        out['HoldingPeriodStatus'] = self._status.reindex(out.index)
+
+        # Most frequent tag; ties go to the alphabetically first tag
+        tags = numeric[sorted(c for c in numeric.columns if c.startswith(TAG_PREFIX))]
+        out['UnderperformanceTag'] = (
+            tags.idxmax(axis=1).str[len(TAG_PREFIX):] if len(tags.columns) else 'Unknown'
+        )
+
+        out = out.rename_axis('ScripName').reset_index()
+        out['Status'] = gain_status(out['Gain/Loss'])
+        return out
+
+    def breakdown(self, scrip=None):
+        # Per-account rows (Account, ScripName, sums, status) for drill-down
+        if not self._accounts:
+            return pd.DataFrame(columns=['Account', 'ScripName'] + ADDITIVE_COLUMNS)
+        frames = {
+            account: numeric[ADDITIVE_COLUMNS].assign(HoldingPeriodStatus=status)
+            for account, (_, numeric, status) in self._accounts.items()
+        }
+        out = pd.concat(frames, names=['Account', 'ScripName']).reset_index()
+        if scrip is not None:
+            out = out[out['ScripName'] == scrip]
+        return out
@@ -0,0 +1,106 @@
+import io
+import os
+
+import pandas as pd
+from openpyxl import load_workbook
+
+from cache_utils import LRUCache, file_hash
+
+# -----------------------------
+# PORTFOLIO FILE LOADING
+# -----------------------------
+# Broker exports are read with openpyxl in read-only mode (rows streamed as
+# plain values, no styles or cell objects), normalized once, and cached by
+# content hash: in memory for the process and as a pickled frame on disk, so
+# the same workbook is never parsed twice, even across restarts. The disk
+# cache keeps the most recently used files only.
+
+CACHE_DIR = "portfolio_cache"
+CACHE_ENTRIES = 32
+CACHE_FILES = 64
+NUMERIC_COLUMNS = [
+    'Quantity', 'Buying Quanta', 'Selling Quanta', 'Gain/Loss', '% wtge', '%tage', 'holding period'
+]
+
+
+def read_portfolio_excel(data):
+    # First sheet, first row as header; same frame pd.read_excel would give
+    wb = load_workbook(io.BytesIO(data), read_only=True, data_only=True)
+    try:
+        rows = wb.worksheets[0].iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return pd.DataFrame()
+        columns = [f"Unnamed: {i}" if name is None else name for i, name in enumerate(header)]
+        df = pd.DataFrame.from_records(rows, columns=columns)
+    finally:
+        wb.close()
+    # Read-only sheets can report formatted but empty trailing rows
+    return df.dropna(how='all').reset_index(drop=True)
+
+
+def normalize_portfolio(df):
+    df = df.copy()
+    df['ScripName'] = df['ScripName'].str.strip().str.upper()
+    for col in NUMERIC_COLUMNS:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors='coerce')
+    return df
+
+
+class PortfolioCache(LRUCache):
+    # Normalized frames keyed by content hash, shared across sessions
+
+    def __init__(self, cache_dir=CACHE_DIR, max_entries=CACHE_ENTRIES, max_files=CACHE_FILES):
+        super().__init__(max_entries)
+        self.cache_dir = cache_dir
+        self.max_files = max_files
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _path(self, digest):
+        return os.path.join(self.cache_dir, f"{digest}.pkl")
+
+    def _read_file(self, digest):
+        path = self._path(digest)
+        try:
+            df = pd.read_pickle(path)
+            os.utime(path)  # mtime doubles as last use for pruning
+            return df
+        except Exception:
+            # Missing, truncated or written by an incompatible pandas
+            return None
+
+    def _write_file(self, digest, df):
+        path = self._path(digest)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        df.to_pickle(tmp)
+        os.replace(tmp, path)
+        self._prune()
+
+    def _prune(self):
+        # Drop the least recently used files beyond max_files
+        entries = []
+        for entry in os.scandir(self.cache_dir):
+            if entry.name.endswith(".pkl"):
+                try:
+                    entries.append((entry.stat().st_mtime, entry.path))
+                except FileNotFoundError:
+                    pass
+        entries.sort(reverse=True)
+        for _, path in entries[self.max_files:]:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass  # pruned concurrently by another session
+
+    def load(self, data):
+        # Returns a copy, so callers can add columns freely
+        digest = file_hash(data)
+        df = self.get(digest)
+        if df is None:
+            df = self._read_file(digest)
+            if df is None:
+                df = normalize_portfolio(read_portfolio_excel(data))
+                self._write_file(digest, df)
+            self.put(digest, df)
+        return df.copy()
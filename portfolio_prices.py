@@ -0,0 +1,102 @@
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from portfolio_rules import gain_status
+
+# -----------------------------
+# LIVE MARK-TO-MARKET
+# -----------------------------
+# Current prices for every scrip are fetched in one batched multi-ticker
+# download (NSE first, then BSE for the misses) and kept in a short-TTL cache
+# shared by all sessions. Values, Gain/Loss and weights are then recomputed
+# as column arithmetic. The price source is any callable taking a list of
+# tickers and returning {ticker: price}, so a local stand-in can replace
+# Yahoo Finance.
+
+PRICE_TTL = 60
+EXCHANGE_SUFFIXES = ('.NS', '.BO')
+
+
+def yahoo_source(tickers):
+    # One yf.download call for all tickers; last available close per ticker
+    import yfinance as yf
+
+    if not tickers:
+        return {}
+    data = yf.download(
+        tickers, period="5d", interval="1d", group_by="column",
+        auto_adjust=False, progress=False, threads=True
+    )
+    if data.empty:
+        return {}
+    close = data['Close']
+    if isinstance(close, pd.Series):
+        close = close.to_frame(tickers[0])
+    last = close.ffill().iloc[-1].dropna()
+    return {ticker: float(price) for ticker, price in last.items()}
+
+
+class PriceCache:
+    # symbol -> (price or None, fetched_at); misses are cached too, so an
+    # unlisted scrip is not re-requested on every rerun
+
+    def __init__(self, source=yahoo_source, ttl=PRICE_TTL, suffixes=EXCHANGE_SUFFIXES):
+        self.source = source
+        self.ttl = ttl
+        self.suffixes = suffixes
+        self._prices = {}
+        self._lock = threading.Lock()
+
+    def _fresh(self, symbol, now):
+        entry = self._prices.get(symbol)
+        return entry is not None and now - entry[1] <= self.ttl
+
+    def prices(self, symbols):
+        # Returns a float Series indexed by symbol (NaN where no price found).
+        # Held under the lock so concurrent sessions share one download.
+        symbols = list(dict.fromkeys(str(s).strip().upper() for s in symbols))
+        with self._lock:
+            now = time.time()
+            missing = [s for s in symbols if not self._fresh(s, now)]
+            found = {}
+            for suffix in self.suffixes:
+                if not missing:
+                    break
+                quotes = self.source([s + suffix for s in missing])
+                for s in missing:
+                    price = quotes.get(s + suffix)
+                    if price is not None and np.isfinite(price) and price > 0:
+                        found[s] = price
+                missing = [s for s in missing if s not in found]
+
+            for s in symbols:
+                if not self._fresh(s, now):
+                    self._prices[s] = (found.get(s), now)
+            return pd.Series(
+                [self._prices[s][0] for s in symbols], index=symbols, dtype=float
+            )
+
+    def fetched_at(self, symbols):
+        # Oldest fetch time among the given symbols, or None
+        with self._lock:
+            times = [self._prices[s][1] for s in symbols if s in self._prices]
+        return min(times) if times else None
+
+
+def mark_to_market(consolidated, prices):
+    # consolidated: per-scrip frame (ScripName, Quantity, Buying Quanta, ...).
+    # Scrips without a live price keep their uploaded Selling Quanta.
+    out = consolidated.copy()
+    live = out['ScripName'].map(prices).astype(float)
+    value = out['Quantity'] * live
+
+    out['Live Price'] = live
+    out['Selling Quanta'] = value.fillna(out['Selling Quanta'])
+    out['Gain/Loss'] = out['Selling Quanta'] - out['Buying Quanta']
+    total = out['Selling Quanta'].sum()
+    out['% wtge'] = out['Selling Quanta'] / total * 100 if total else 0.0
+    out['Status'] = gain_status(out['Gain/Loss'])
+    return out
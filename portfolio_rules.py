@@ -0,0 +1,53 @@
+import numpy as np
+import pandas as pd
+
+# -----------------------------
+# PORTFOLIO HOLDING RULES
+# -----------------------------
+# Lot classification as data: holding-period bins and an ordered condition
+# table, each evaluated over whole columns at once. The first matching rule
+# wins, exactly as in the original per-row if/elif chains.
+
+HOLDING_BINS = [-np.inf, 90, 365, 1095, np.inf]
+HOLDING_LABELS = ['Less than 3M', '3M–1Y', '1Y–3Y', '3Y+']
+LONG_TERM_DAYS = 365
+TOO_EARLY_DAYS = 90
+
+# (tag, holding days greater than, return % below), checked in order
+UNDERPERFORMANCE_RULES = [
+    ('Dud', 180, 0),
+    ('Sluggish', 180, 9),
+    ('Dragger', 90, 0),
+    ('Not Moving', 90, 9),
+]
+UNDERPERFORMANCE_TAGS = ['Unknown', 'Too Early'] + [tag for tag, _, _ in UNDERPERFORMANCE_RULES] + ['Healthy']
+
+
+def categorize_holding(days):
+    days = pd.to_numeric(days, errors='coerce')
+    category = pd.cut(days, HOLDING_BINS, labels=HOLDING_LABELS, right=False)
+    return category.cat.add_categories('Unknown').fillna('Unknown')
+
+
+def holding_status(days):
+    days = pd.to_numeric(days, errors='coerce')
+    status = np.select([days.isna(), days < LONG_TERM_DAYS], ['Unknown', 'Short Term'], 'Long Term')
+    return pd.Series(pd.Categorical(status, categories=['Short Term', 'Long Term', 'Unknown']), index=days.index)
+
+
+def classify_underperformance(days, return_pct):
+    days = pd.to_numeric(days, errors='coerce')
+    return_pct = pd.to_numeric(return_pct, errors='coerce')
+
+    conditions = [days.isna() | return_pct.isna(), days <= TOO_EARLY_DAYS]
+    choices = ['Unknown', 'Too Early']
+    for tag, min_days, max_return in UNDERPERFORMANCE_RULES:
+        conditions.append((days > min_days) & (return_pct < max_return))
+        choices.append(tag)
+
+    tags = np.select(conditions, choices, 'Healthy')
+    return pd.Series(pd.Categorical(tags, categories=UNDERPERFORMANCE_TAGS), index=days.index)
+
+
+def gain_status(gain_loss):
+    return np.select([gain_loss > 0, gain_loss < 0], ['Positive', 'Negative'], 'Neutral')
@@ -1,72 +1,100 @@
 
+from functools import partial
+
 import streamlit as st
 import pandas as pd
+from cache_utils import file_hash
+from corp_action_adjust import action_events, adjust_lots, lots_from_portfolio
+from corp_actions_store import CorpActionStore
+from portfolio_rules import categorize_holding, classify_underperformance, holding_status
+from portfolio_consolidate import PortfolioConsolidator
+from portfolio_loader import PortfolioCache
+from portfolio_prices import PriceCache, mark_to_market
 
 st.title("📊 Portfolio Tracker with Tabs + Low Weightage View")
 
-uploaded_file = st.file_uploader("Upload your portfolio Excel file", type=["xlsx"])
-
-if uploaded_file:
-    df = pd.read_excel(uploaded_file, sheet_name=0)
-
-    # Normalize scrip names
-    df['ScripName'] = df['ScripName'].str.strip().str.upper()
-    df['% wtge'] = pd.to_numeric(df['% wtge'], errors='coerce')
-
-    # Categorize holding periods
-    def categorize_holding(days):
-        if pd.isna(days):
-            return 'Unknown'
-        if days < 90:
-            return 'Less than 3M'
-        elif days < 365:
-            return '3M–1Y'
-        elif days < 1095:
-            return '1Y–3Y'
-        else:
-            return '3Y+'
-
-    def holding_status(days):
-        if pd.isna(days):
-            return 'Unknown'
-        return 'Short Term' if days < 365 else 'Long Term'
-
-    def classify_underperformance(days, return_pct):
-        if pd.isna(days) or pd.isna(return_pct):
-            return 'Unknown'
-        if days <= 90:
-            return 'Too Early'
-        if days > 180:
-            if return_pct < 0:
-                return 'Dud'
-            elif return_pct < 9:
-                return 'Sluggish'
-        if days > 90:
-            if return_pct < 0:
-                return 'Dragger'
-            elif return_pct < 9:
-                return 'Not Moving'
-        return 'Healthy'
-
-    def tag_underperformance(row):
-        return classify_underperformance(row['holding period'], row['%tage'])
-
-    df['HoldingCategory'] = df['holding period'].apply(categorize_holding)
-    df['HoldingPeriodStatus'] = df['holding period'].apply(holding_status)
-    df['UnderperformanceTag'] = df.apply(tag_underperformance, axis=1)
-
-    # Consolidate holdings
-    consolidated = df.groupby('ScripName').agg({
-        'Quantity': 'sum',
-        'Buying Quanta': 'sum',
-        'Selling Quanta': 'sum',
-        'Gain/Loss': 'sum',
-        '% wtge': 'sum',
-        'HoldingPeriodStatus': 'first',
-        'UnderperformanceTag': lambda x: x.mode().iloc[0] if not x.mode().empty else 'Unknown'
-    }).reset_index()
-
-    consolidated['Status'] = consolidated['Gain/Loss'].apply(lambda x: 'Positive' if x > 0 else 'Negative' if x < 0 else 'Neutral')
+
+# Corporate actions archive built by bc_corp_actions_app.py
+@st.cache_resource
+def get_corp_action_store():
+    return CorpActionStore()
+
+
+# Parsed workbooks by content hash, so filter changes never re-read Excel
+@st.cache_resource
+def get_portfolio_cache():
+    return PortfolioCache()
+
+
+# Live quotes shared by all sessions, refreshed at most once a minute
+@st.cache_resource
+def get_price_cache():
+    return PriceCache()
+
+
+uploaded_files = st.file_uploader(
+    "Upload your portfolio Excel files (one per account)", type=["xlsx"], accept_multiple_files=True
+)
+
+if uploaded_files:
+    # Replay bonus / split (and optionally rights) actions from the BC archive
+    apply_actions = st.sidebar.checkbox("Apply corporate actions (from archive)")
+    include_rights = apply_actions and st.sidebar.checkbox("Assume rights were subscribed")
+    export_date = None
+    if apply_actions:
+        # Holding periods count from the export date; buy dates are estimated
+        # as export date minus holding period
+        export_date = st.sidebar.date_input("Portfolio export date", value=pd.Timestamp.today())
+        st.sidebar.caption("Buy dates are approximate: export date minus holding period.")
+    adjustments = st.session_state.setdefault("corp_action_adjustments", {})
+
+    def account_lots(account, data):
+        df = get_portfolio_cache().load(data)
+        if apply_actions:
+            actions = get_corp_action_store().actions_for_symbols(df['ScripName'].unique())
+            events = action_events(actions, include_rights=include_rights)
+            df = adjust_lots(lots_from_portfolio(df, as_of=export_date), events)
+            adjustments[account] = ((df['Adj Factor'] != 1.0).sum(), len(events))
+            df['Quantity'] = df['Adj Quantity']
+            df['Buying Quanta'] = df['Adj Cost']
+            # Rights subscriptions change the cost, so returns follow it
+            df['Gain/Loss'] = df['Selling Quanta'] - df['Buying Quanta']
+            df['%tage'] = df['Gain/Loss'] / df['Buying Quanta'] * 100
+
+        # Classify lots with vectorized rules (see portfolio_rules)
+        df['HoldingCategory'] = categorize_holding(df['holding period'])
+        df['HoldingPeriodStatus'] = holding_status(df['holding period'])
+        df['UnderperformanceTag'] = classify_underperformance(df['holding period'], df['%tage'])
+        return df
+
+    # Consolidate holdings across accounts; only new or changed files are
+    # reclassified and merged into the session's running totals
+    sources = {}
+    for f in uploaded_files:
+        account = f.name.replace(".xlsx", "")
+        data = f.getvalue()
+        key = (file_hash(data), apply_actions, include_rights, export_date)
+        sources[account] = (key, partial(account_lots, account, data))
+
+    consolidator = st.session_state.setdefault("consolidator", PortfolioConsolidator())
+    consolidator.sync(sources)
+    consolidated = consolidator.consolidated()
+
+    if apply_actions:
+        adjusted = sum(adjustments[a][0] for a in sources if a in adjustments)
+        n_events = sum(adjustments[a][1] for a in sources if a in adjustments)
+        st.sidebar.caption(f"{adjusted} lot(s) adjusted by {n_events} action(s).")
+    if len(sources) > 1:
+        st.sidebar.caption(f"{len(sources)} accounts consolidated; % wtge is share of combined value.")
+
+    # Revalue holdings at current prices instead of the uploaded Selling Quanta
+    if st.sidebar.checkbox("Live prices (mark-to-market)"):
+        price_cache = get_price_cache()
+        prices = price_cache.prices(consolidated['ScripName'])
+        consolidated = mark_to_market(consolidated, prices)
+        fetched_at = price_cache.fetched_at(prices.index)
+        as_of = pd.Timestamp(fetched_at, unit='s', tz='Asia/Kolkata').strftime('%H:%M:%S') if fetched_at else '-'
+        st.sidebar.caption(f"{prices.notna().sum()} of {len(prices)} scrip(s) priced live (as of {as_of} IST).")
 
     # Sidebar filters
     status_filter = st.sidebar.selectbox("Filter by Status", ["All", "Positive", "Negative", "Neutral"])
@@ -112,12 +140,13 @@ if uploaded_file:
     }])], ignore_index=True))
 
     # Tabs section
-    tab1, tab2, tab3, tab4, tab5 = st.tabs([
+    tab1, tab2, tab3, tab4, tab5, tab6 = st.tabs([
         "⭐ Top 5 Holdings",
         "🔟 Top 10 Holdings",
         "📌 Insights & Alerts",
         "🧿 Sub-1% Holdings",
-        "🐢 Underperformers"
+        "🐢 Underperformers",
+        "🏦 By Account"
     ])
 
     with tab1:
@@ -168,3 +197,12 @@ if uploaded_file:
         else:
             st.markdown("### 🐢 Stocks Tagged as Underperformers")
             st.dataframe(underperf[['ScripName', '% wtge', 'Gain/Loss', 'UnderperformanceTag', 'HoldingPeriodStatus']].sort_values(by='% wtge', ascending=False))
+
+    with tab6:
+        scrip = st.selectbox("Scrip", ["All"] + consolidated['ScripName'].tolist())
+        by_account = consolidator.breakdown(None if scrip == "All" else scrip)
+        if scrip == "All":
+            by_account = by_account.groupby('Account', sort=False)[
+                ['Quantity', 'Buying Quanta', 'Selling Quanta', 'Gain/Loss']
+            ].sum().reset_index()
+        st.dataframe(by_account, hide_index=True)
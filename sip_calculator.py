@@ -1,94 +1,237 @@
-
 import streamlit as st
+import io
 import pandas as pd
+import numpy as np
 import matplotlib.pyplot as plt
 import datetime
-import gspread
-from google.oauth2.service_account import Credentials
+from sip_engine import (
+    lumpsum_schedule,
+    months_to_goal,
+    months_to_goal_grid,
+    required_stepup_sip,
+    sip_cashflows,
+    stepup_schedule_batch,
+    xirr,
+)
+from sip_montecarlo import simulate_sip
+from visitor_log import VisitorLogWriter
 
 # Google Sheets credentials from local file
 scope = ["https://spreadsheets.google.com/feeds", "https://www.googleapis.com/auth/drive"]
-creds = Credentials.from_service_account_file("client_secret.json", scopes=scope)
-client = gspread.authorize(creds)
 
-# Logging function to write data to Google Sheet
+
+# Authorized on first use so page loads don't wait on a credentials load and
+# auth round-trip; shared across sessions once created.
+@st.cache_resource
+def get_client():
+    import gspread
+    from google.oauth2.service_account import Credentials
+
+    creds = Credentials.from_service_account_file("client_secret.json", scopes=scope)
+    return gspread.authorize(creds)
+
+
+# Background writer that batches visitor rows into the sheet; one per process
+@st.cache_resource
+def get_visitor_log():
+    return VisitorLogWriter(lambda: get_client().open("Visitor_Log").sheet1)
+
+
+# Logging function to queue data for the Google Sheet
 def log_user_data(name, email, mobile):
     try:
-        sheet = client.open("Visitor_Log").sheet1
-        sheet.append_row([
+        get_visitor_log().submit([
             datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
             name, email, mobile
         ])
     except Exception as e:
-        st.error("Could not log to Google Sheet.")
+        st.error("Could not save your details.")
         st.exception(e)
 
+# -------------- Cached computations ----------------
+# Results and rendered charts are cached across reruns and visitors, keyed on
+# each tab's inputs. max_entries bounds every cache; the oldest entries are
+# evicted first.
+CACHE_ENTRIES = 256
+
+
+def render_png(fig):
+    buf = io.BytesIO()
+    fig.savefig(buf, format="png", bbox_inches="tight")
+    plt.close(fig)
+    return buf.getvalue()
+
+
+@st.cache_data(max_entries=CACHE_ENTRIES)
+def forward_projection(monthly_investment, annual_rate, years, step_up, inflation):
+    schedule = stepup_schedule_batch(monthly_investment, annual_rate, years, step_up, inflation)
+    df = pd.DataFrame({key: values[0] for key, values in schedule.items() if key not in ("Month", "Months")})
+    df.insert(0, "Month", schedule["Month"])
+    sip_xirr = xirr(*sip_cashflows(schedule))[0]
+    return df, sip_xirr
+
+
+@st.cache_data(max_entries=CACHE_ENTRIES)
+def forward_chart(monthly_investment, annual_rate, years, step_up, inflation):
+    df, _ = forward_projection(monthly_investment, annual_rate, years, step_up, inflation)
+
+    fig, ax = plt.subplots()
+    ax.plot(df["Month"], df["Invested Amount"], label="Invested", color="blue")
+    ax.plot(df["Month"], df["Future Value"], label="Value", color="green")
+    if inflation > 0:
+        ax.plot(df["Month"], df["Real Value"], label="Real Value", color="orange", linestyle="--")
+    ax.set_title("SIP Growth Over Time")
+    ax.set_xlabel("Month")
+    ax.set_ylabel("Amount (₹)")
+    ax.legend()
+    return render_png(fig)
+
+
+@st.cache_data(max_entries=CACHE_ENTRIES)
+def monte_carlo(monthly_investment, years, annual_rate, volatility, n_paths, step_up, goal):
+    return simulate_sip(
+        monthly_investment, years, annual_rate, volatility,
+        n_paths=n_paths, step_up_pct=step_up, goal=goal, seed=42,
+    )
+
+
+@st.cache_data(max_entries=CACHE_ENTRIES)
+def monte_carlo_chart(monthly_investment, years, annual_rate, volatility, n_paths, step_up, goal):
+    mc = monte_carlo(monthly_investment, years, annual_rate, volatility, n_paths, step_up, goal)
+    bands = mc["Bands"]
+
+    fig, ax = plt.subplots()
+    ax.fill_between(mc["Month"], bands[5], bands[95], color="green", alpha=0.15, label="5th–95th pct")
+    ax.fill_between(mc["Month"], bands[25], bands[75], color="green", alpha=0.35, label="25th–75th pct")
+    ax.plot(mc["Month"], bands[50], color="green", label="Median")
+    ax.plot(mc["Month"], mc["Invested Amount"], color="blue", label="Invested")
+    ax.set_title("Range of SIP Outcomes")
+    ax.set_xlabel("Month")
+    ax.set_ylabel("Amount (₹)")
+    ax.legend()
+    return render_png(fig)
+
+
+@st.cache_data(max_entries=CACHE_ENTRIES)
+def lumpsum_projection(lumpsum_amount, lumpsum_annual_rate, lumpsum_years):
+    return pd.DataFrame(lumpsum_schedule(lumpsum_amount, lumpsum_annual_rate, lumpsum_years))
+
+
+@st.cache_data(max_entries=CACHE_ENTRIES)
+def lumpsum_chart(lumpsum_amount, lumpsum_annual_rate, lumpsum_years):
+    df_lump = lumpsum_projection(lumpsum_amount, lumpsum_annual_rate, lumpsum_years)
+
+    fig, ax = plt.subplots()
+    ax.plot(df_lump["Year"], df_lump["Value"], color="purple")
+    ax.set_title("Lump Sum Growth Over Time")
+    ax.set_xlabel("Year")
+    ax.set_ylabel("Amount (₹)")
+    return render_png(fig)
+
+
+@st.cache_data(max_entries=CACHE_ENTRIES)
+def time_to_goal_chart(sip_amount, goal):
+    # Heatmap of years to target around the chosen SIP and return
+    sip_grid = np.unique(np.clip(np.linspace(0.25, 2.0, 8) * sip_amount, 100, None).round(-2))
+    rate_grid = np.arange(6.0, 19.0, 1.0)
+    years_grid = months_to_goal_grid(sip_grid, rate_grid, goal) / 12
+
+    fig, ax = plt.subplots()
+    im = ax.imshow(years_grid, aspect="auto", cmap="RdYlGn_r", origin="lower")
+    ax.set_xticks(range(len(rate_grid)))
+    ax.set_xticklabels([f"{x:.0f}%" for x in rate_grid])
+    ax.set_yticks(range(len(sip_grid)))
+    ax.set_yticklabels([f"₹{x:,.0f}" for x in sip_grid])
+    ax.set_title("Years to Target")
+    ax.set_xlabel("Expected Annual Return")
+    ax.set_ylabel("Monthly SIP")
+    fig.colorbar(im, ax=ax, label="Years")
+    return render_png(fig)
+
+
 # Streamlit App UI
 st.set_page_config(page_title="SIP Calculator", layout="centered")
 st.title("📈 SIP Calculator")
 
-tab1, tab2, tab3, tab5, spacer, tab4 = st.tabs(["Forward SIP", "Reverse SIP", "Lump Sum", "Time to ₹1 Cr", "  ", "🚀 Start SIPping Today"])
+tab1, tab2, tab3, tab5, spacer, tab4 = st.tabs(["Forward SIP", "Reverse SIP", "Lump Sum", "Time to Target", "  ", "🚀 Start SIPping Today"])
+
+# Each tab is a fragment: changing an input reruns only that tab.
 
 
 # ---------- FORWARD CALCULATION ----------
-with tab1:
+@st.fragment
+def forward_tab():
     st.header("🔹 Forward SIP Calculator")
     monthly_investment = st.number_input("Monthly Investment (₹)", min_value=100, step=100)
     annual_rate = st.number_input("Expected Annual Return (%)", min_value=1.0, value=12.0)
     years = st.number_input("Investment Period (Years)", min_value=1, value=10)
+    step_up = st.number_input("Annual Step-up (%)", min_value=0.0, value=0.0, step=1.0)
+    inflation = st.number_input("Expected Inflation (%)", min_value=0.0, value=0.0, step=0.5)
 
-    r = annual_rate / 12 / 100
-    n = int(years * 12)
+    df, sip_xirr = forward_projection(monthly_investment, annual_rate, years, step_up, inflation)
 
-    fv = monthly_investment * (((1 + r) ** n - 1) / r) * (1 + r)
-    total_invested = monthly_investment * n
-    gain = fv - total_invested
+    fv = df["Future Value"].iloc[-1]
+    total_invested = df["Invested Amount"].iloc[-1]
+    gain = df["Gain"].iloc[-1]
 
     st.subheader(f"📌 Future Value: ₹{fv:,.0f}")
     st.write(f"💰 Total Invested: ₹{total_invested:,.0f}")
     st.write(f"📈 Estimated Gain: ₹{gain:,.0f}")
+    st.write(f"📊 XIRR: {sip_xirr * 100:.2f}%")
+    if inflation > 0:
+        st.write(f"🛒 Value in Today's Money: ₹{df['Real Value'].iloc[-1]:,.0f}")
 
     # Plotting
-    df = pd.DataFrame({
-        "Month": list(range(1, n + 1)),
-        "Invested Amount": [monthly_investment * i for i in range(1, n + 1)],
-        "Future Value": [monthly_investment * (((1 + r) ** i - 1) / r) * (1 + r) for i in range(1, n + 1)]
-    })
+    st.image(forward_chart(monthly_investment, annual_rate, years, step_up, inflation))
+
+    # Monte Carlo mode
+    if st.checkbox("🎲 Simulate Market Ups and Downs (Monte Carlo)"):
+        volatility = st.number_input("Annual Volatility (%)", min_value=0.0, value=15.0, step=1.0)
+        n_paths = st.select_slider("Simulated Paths", options=[1_000, 10_000, 50_000, 100_000], value=10_000)
+        mc_goal = st.number_input("Goal Corpus (₹)", min_value=0, step=100000, value=int(round(fv, -5)), key="mc_goal")
+
+        mc_inputs = (monthly_investment, years, annual_rate, volatility, n_paths, step_up, mc_goal)
+        mc = monte_carlo(*mc_inputs)
+
+        st.write(f"🎯 Chance of reaching ₹{mc_goal:,.0f}: {mc['Probability of Goal'] * 100:.1f}%")
+        st.write(
+            f"📉 Pessimistic (5th pct): ₹{mc['Final'][5]:,.0f} · "
+            f"Median: ₹{mc['Final'][50]:,.0f} · "
+            f"📈 Optimistic (95th pct): ₹{mc['Final'][95]:,.0f}"
+        )
+        st.image(monte_carlo_chart(*mc_inputs))
 
-    fig, ax = plt.subplots()
-    ax.plot(df["Month"], df["Invested Amount"], label="Invested", color="blue")
-    ax.plot(df["Month"], df["Future Value"], label="Value", color="green")
-    ax.set_title("SIP Growth Over Time")
-    ax.set_xlabel("Month")
-    ax.set_ylabel("Amount (₹)")
-    ax.legend()
-    st.pyplot(fig)
 
 # ---------- REVERSE CALCULATION ----------
-with tab2:
+@st.fragment
+def reverse_tab():
     st.header("🔁 Reverse SIP Calculator")
     goal_amount = st.number_input("Target Amount (₹)", min_value=10000, step=10000, value=500000)
     reverse_annual_rate = st.number_input("Expected Annual Return (%)", min_value=1.0, value=12.0, key="reverse_rate")
     reverse_years = st.number_input("Investment Period (Years)", min_value=1, value=10, key="reverse_years")
-
-    r_rev = reverse_annual_rate / 12 / 100
-    n_rev = int(reverse_years * 12)
-
-    if r_rev > 0:
-        required_sip = goal_amount * r_rev / (((1 + r_rev) ** n_rev - 1) * (1 + r_rev))
-        st.subheader(f"💸 Required Monthly SIP: ₹{required_sip:,.0f}")
+    reverse_step_up = st.number_input("Annual Step-up (%)", min_value=0.0, value=0.0, step=1.0, key="reverse_step_up")
+
+    if reverse_annual_rate > 0:
+        required_sip = required_stepup_sip(goal_amount, reverse_annual_rate, reverse_years, reverse_step_up)
+        if reverse_step_up > 0:
+            st.subheader(f"💸 Required Starting Monthly SIP: ₹{required_sip:,.0f}")
+            st.write(f"📈 Stepping up {reverse_step_up:g}% every year")
+        else:
+            st.subheader(f"💸 Required Monthly SIP: ₹{required_sip:,.0f}")
     else:
         st.warning("Interest rate must be greater than 0")
 
+
 # ---------- LUMP SUM CALCULATION ----------
-with tab3:
+@st.fragment
+def lumpsum_tab():
     st.header("💼 Lump Sum Investment Calculator")
     lumpsum_amount = st.number_input("Investment Amount (₹)", min_value=1000, step=1000, value=100000)
     lumpsum_annual_rate = st.number_input("Expected Annual Return (%)", min_value=1.0, value=12.0, key="lump_rate")
     lumpsum_years = st.number_input("Investment Period (Years)", min_value=1, value=10, key="lump_years")
 
-    r_lump = lumpsum_annual_rate / 100
-    fv_lump = lumpsum_amount * ((1 + r_lump) ** lumpsum_years)
+    df_lump = lumpsum_projection(lumpsum_amount, lumpsum_annual_rate, lumpsum_years)
+    fv_lump = df_lump["Value"].iloc[-1]
     gain_lump = fv_lump - lumpsum_amount
 
     st.subheader(f"📌 Future Value: ₹{fv_lump:,.0f}")
@@ -96,51 +239,33 @@ with tab3:
     st.write(f"📈 Estimated Gain: ₹{gain_lump:,.0f}")
 
     # Plotting lump sum growth
-    df_lump = pd.DataFrame({
-        "Year": list(range(1, lumpsum_years + 1)),
-        "Value": [lumpsum_amount * ((1 + r_lump) ** i) for i in range(1, lumpsum_years + 1)]
-    })
-
-    fig_lump, ax_lump = plt.subplots()
-    ax_lump.plot(df_lump["Year"], df_lump["Value"], color="purple")
-    ax_lump.set_title("Lump Sum Growth Over Time")
-    ax_lump.set_xlabel("Year")
-    ax_lump.set_ylabel("Amount (₹)")
-    st.pyplot(fig_lump)
-
+    st.image(lumpsum_chart(lumpsum_amount, lumpsum_annual_rate, lumpsum_years))
 
 
-# ---------- TIME TO ₹1 CRORE CALCULATION ----------
-with tab5:
-    st.header("🏁 Time to ₹1 Crore")
+# ---------- TIME TO TARGET CALCULATION ----------
+@st.fragment
+def time_to_goal_tab():
+    st.header("🏁 Time to Target Corpus")
     sip_amount = st.number_input("Monthly SIP (₹)", min_value=100, step=100, value=10000)
     annual_rate_crore = st.number_input("Expected Annual Return (%)", min_value=1.0, value=12.0, key="crore_rate")
+    goal = st.number_input("Target Corpus (₹)", min_value=100000, step=100000, value=1_00_00_000, key="crore_goal")
 
-    r_crore = annual_rate_crore / 12 / 100
-    goal = 1_00_00_000  # 1 crore
-    max_months = 1000  # Cap at ~83 years
-
-    def calculate_months_to_goal(p, r, target):
-        months = 1
-        while months <= max_months:
-            fv = p * (((1 + r) ** months - 1) / r) * (1 + r)
-            if fv >= target:
-                return months
-            months += 1
-        return None
-
-    months_needed = calculate_months_to_goal(sip_amount, r_crore, goal)
+    months_needed = months_to_goal(sip_amount, annual_rate_crore, goal)
 
-    if months_needed:
+    if not np.isnan(months_needed):
+        months_needed = int(months_needed)
         years_needed = months_needed // 12
         extra_months = months_needed % 12
-        st.subheader(f"🗓️ You will reach ₹1 Crore in {years_needed} years and {extra_months} months.")
+        st.subheader(f"🗓️ You will reach ₹{goal:,.0f} in {years_needed} years and {extra_months} months.")
     else:
-        st.warning("With this SIP and return rate, ₹1 Cr may take too long or not be reachable.")
+        st.warning(f"With this SIP and return rate, ₹{goal:,.0f} may take too long or not be reachable.")
+
+    st.image(time_to_goal_chart(sip_amount, goal))
 
 
 # -------------- Visitor Info Tab ----------------
-with tab4:
+@st.fragment
+def visitor_tab():
     st.header("📬 Let's Connect!")
 
     with st.form("visitor_form_tab"):
@@ -163,3 +288,17 @@ with tab4:
     """)
 
 
+with tab1:
+    forward_tab()
+
+with tab2:
+    reverse_tab()
+
+with tab3:
+    lumpsum_tab()
+
+with tab5:
+    time_to_goal_tab()
+
+with tab4:
+    visitor_tab()
@@ -0,0 +1,281 @@
+import numpy as np
+
+# -----------------------------
+# SIP PROJECTION ENGINE
+# -----------------------------
+# Pure NumPy math behind the SIP calculator tabs (no Streamlit or Google
+# imports), so batch jobs and benchmarks can import it directly.
+# Month-by-month schedules are computed as whole arrays so the Forward SIP tab
+# and batch jobs (scenario sweeps) share the same code path.
+
+
+def monthly_rate(annual_rate):
+    return np.asarray(annual_rate, dtype=float) / 12 / 100
+
+
+def _growth_factors(r, months):
+    # (1 + r) ** i for i = 1..months, broadcast over a column of rates
+    i = np.arange(1, months + 1)
+    return np.power(1 + np.asarray(r, dtype=float)[..., None], i)
+
+
+def _annuity_due(amount, r, growth):
+    # FV of a SIP paid at the start of each month; r == 0 degenerates to amount * i
+    amount = np.asarray(amount, dtype=float)[..., None]
+    r = np.asarray(r, dtype=float)[..., None]
+    months = np.arange(1, growth.shape[-1] + 1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        fv = amount * (growth - 1) / r * (1 + r)
+    return np.where(r == 0, amount * months, fv)
+
+
+def sip_schedule(monthly_investment, annual_rate, years):
+    n = int(years * 12)
+    r = monthly_rate(annual_rate)
+    growth = _growth_factors(r, n)
+
+    month = np.arange(1, n + 1)
+    invested = monthly_investment * month.astype(float)
+    value = _annuity_due(monthly_investment, r, growth)
+
+    return {
+        "Month": month,
+        "Invested Amount": invested,
+        "Future Value": value,
+        "Gain": value - invested,
+    }
+
+
+def sip_schedule_batch(monthly_investments, annual_rates, years):
+    # Each argument is broadcast to a common 1-D shape of scenarios. Rows are
+    # padded to the longest tenure; months past a scenario's tenure are NaN.
+    amounts, rates, tenures = np.broadcast_arrays(
+        np.asarray(monthly_investments, dtype=float),
+        np.asarray(annual_rates, dtype=float),
+        np.asarray(years, dtype=float),
+    )
+    amounts, rates, tenures = amounts.ravel(), rates.ravel(), tenures.ravel()
+
+    n = (tenures * 12).astype(int)
+    max_n = int(n.max()) if n.size else 0
+    r = monthly_rate(rates)
+    growth = _growth_factors(r, max_n)
+
+    month = np.arange(1, max_n + 1)
+    active = month[None, :] <= n[:, None]
+
+    invested = np.where(active, amounts[:, None] * month, np.nan)
+    value = np.where(active, _annuity_due(amounts, r, growth), np.nan)
+
+    return {
+        "Month": month,
+        "Months": n,
+        "Invested Amount": invested,
+        "Future Value": value,
+        "Gain": value - invested,
+    }
+
+
+def sip_future_value(monthly_investment, annual_rate, years):
+    # Final corpus only, vectorized over any broadcastable inputs
+    r = monthly_rate(annual_rate)
+    n = np.floor(np.asarray(years, dtype=float) * 12)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        fv = monthly_investment * (((1 + r) ** n - 1) / r) * (1 + r)
+    return np.where(r == 0, monthly_investment * n, fv)
+
+
+def required_sip(goal_amount, annual_rate, years):
+    # Flat monthly SIP needed to reach goal_amount
+    r = monthly_rate(annual_rate)
+    n = np.floor(np.asarray(years, dtype=float) * 12)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        sip = goal_amount * r / (((1 + r) ** n - 1) * (1 + r))
+    return np.where(r == 0, goal_amount / n, sip)
+
+
+# -----------------------------
+# LUMP SUM
+# -----------------------------
+
+
+def lumpsum_future_value(amount, annual_rate, years):
+    return amount * (1 + np.asarray(annual_rate, dtype=float) / 100) ** years
+
+
+def lumpsum_schedule(amount, annual_rate, years):
+    year = np.arange(1, int(years) + 1)
+    return {
+        "Year": year,
+        "Value": lumpsum_future_value(amount, annual_rate, year),
+    }
+
+
+# -----------------------------
+# TIME TO GOAL
+# -----------------------------
+
+MAX_MONTHS = 1000  # Cap at ~83 years
+
+
+def months_to_goal(monthly_investment, annual_rate, target, max_months=MAX_MONTHS):
+    # Smallest n with FV(n) >= target, solved from
+    #   P * ((1 + r)^n - 1) / r * (1 + r) >= T  =>  n >= log(T*r / (P*(1+r)) + 1) / log(1 + r)
+    # Works element-wise on broadcastable inputs; unreachable cells are NaN.
+    p = np.asarray(monthly_investment, dtype=float)
+    r = monthly_rate(annual_rate)
+    t = np.asarray(target, dtype=float)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        exact = np.where(
+            r > 0,
+            np.log(t * r / (p * (1 + r)) + 1) / np.log1p(r),
+            t / p,
+        )
+        n = np.ceil(exact)
+        # Guard against float round-off pushing an exact hit one month late
+        prev = np.maximum(n - 1, 1)
+        prev_fv = np.where(r > 0, p * ((1 + r) ** prev - 1) / r * (1 + r), p * prev)
+        n = np.where((n > 1) & (prev_fv >= t), prev, n)
+
+    n = np.maximum(n, 1)
+    return np.where(np.isfinite(n) & (n <= max_months), n, np.nan)
+
+
+def months_to_goal_grid(monthly_investments, annual_rates, target, max_months=MAX_MONTHS):
+    # Rows follow monthly_investments, columns follow annual_rates
+    p = np.asarray(monthly_investments, dtype=float)[:, None]
+    rates = np.asarray(annual_rates, dtype=float)[None, :]
+    return months_to_goal(p, rates, target, max_months)
+
+
+# -----------------------------
+# STEP-UP SIP AND INFLATION
+# -----------------------------
+
+
+def stepup_schedule_batch(monthly_investments, annual_rates, years, step_up_pct=0.0, inflation_pct=0.0):
+    # Starting SIP grows by step_up_pct every 12 months. Value at month i is
+    #   sum_j c_j * g^(i - j + 1) = g^(i + 1) * cumsum(c_j * g^-j)
+    # so the whole schedule is one cumulative sum per scenario.
+    amounts, rates, tenures, steps, inflation = np.broadcast_arrays(
+        np.asarray(monthly_investments, dtype=float),
+        np.asarray(annual_rates, dtype=float),
+        np.asarray(years, dtype=float),
+        np.asarray(step_up_pct, dtype=float),
+        np.asarray(inflation_pct, dtype=float),
+    )
+    amounts, rates, tenures = amounts.ravel(), rates.ravel(), tenures.ravel()
+    steps, inflation = steps.ravel(), inflation.ravel()
+
+    n = (tenures * 12).astype(int)
+    max_n = int(n.max()) if n.size else 0
+    month = np.arange(1, max_n + 1)
+    active = month[None, :] <= n[:, None]
+
+    step_year = (month - 1) // 12
+    contribution = amounts[:, None] * (1 + steps[:, None] / 100) ** step_year
+    contribution = np.where(active, contribution, 0.0)
+
+    g = 1 + monthly_rate(rates)[:, None]
+    value = g ** (month + 1) * np.cumsum(contribution * g ** -month, axis=1)
+    invested = np.cumsum(contribution, axis=1)
+    deflator = (1 + inflation[:, None] / 100) ** (month / 12)
+
+    return {
+        "Month": month,
+        "Months": n,
+        "Contribution": np.where(active, contribution, np.nan),
+        "Invested Amount": np.where(active, invested, np.nan),
+        "Future Value": np.where(active, value, np.nan),
+        "Gain": np.where(active, value - invested, np.nan),
+        "Real Value": np.where(active, value / deflator, np.nan),
+    }
+
+
+def stepup_schedule(monthly_investment, annual_rate, years, step_up_pct=0.0, inflation_pct=0.0):
+    batch = stepup_schedule_batch(monthly_investment, annual_rate, years, step_up_pct, inflation_pct)
+    return {
+        key: (values if key == "Month" else values[0])
+        for key, values in batch.items()
+        if key != "Months"
+    }
+
+
+def required_stepup_sip(goal_amount, annual_rate, years, step_up_pct=0.0):
+    # FV is linear in the starting SIP, so the reverse solve is the goal divided
+    # by the corpus a ₹1 starting SIP builds under the same step-up plan.
+    goal, rates, tenures, steps = np.broadcast_arrays(
+        np.asarray(goal_amount, dtype=float),
+        np.asarray(annual_rate, dtype=float),
+        np.asarray(years, dtype=float),
+        np.asarray(step_up_pct, dtype=float),
+    )
+    unit = stepup_schedule_batch(1.0, rates, tenures, steps)
+    last = unit["Months"] - 1
+    unit_fv = unit["Future Value"][np.arange(len(last)), last]
+    return (goal.ravel() / unit_fv).reshape(goal.shape)
+
+
+# -----------------------------
+# XIRR
+# -----------------------------
+
+
+def sip_cashflows(schedule_batch):
+    # Contributions go out at the start of each month and the corpus comes back
+    # at the end of the tenure. Returns (cashflows, times in years) for xirr().
+    contribution = np.nan_to_num(schedule_batch["Contribution"])
+    n = schedule_batch["Months"]
+    rows = np.arange(len(n))
+
+    cashflows = np.zeros((len(n), contribution.shape[1] + 1))
+    cashflows[:, :-1] = -contribution
+    cashflows[rows, n] += schedule_batch["Future Value"][rows, n - 1]
+    times = np.arange(cashflows.shape[1]) / 12
+    return cashflows, times
+
+
+def xirr(cashflows, times, lo=-0.99, hi=10.0, tol=1e-10, max_iter=100):
+    # Annualised rate x solving sum(cf / (1 + x)^t) = 0 for every row of
+    # cashflows at once. Newton steps are kept inside a sign-change bracket and
+    # fall back to bisection, so each row converges even from a poor guess.
+    # Rows without a sign change in [lo, hi] come back as NaN.
+    cf = np.atleast_2d(np.asarray(cashflows, dtype=float))
+    t = np.broadcast_to(np.asarray(times, dtype=float), cf.shape)
+
+    def npv(x):
+        base = (1 + x)[:, None]
+        disc = base ** -t
+        f = np.sum(cf * disc, axis=1)
+        df = np.sum(-t * cf * disc / base, axis=1)
+        return f, df
+
+    m = cf.shape[0]
+    lo = np.full(m, lo)
+    hi = np.full(m, hi)
+    f_lo, _ = npv(lo)
+    f_hi, _ = npv(hi)
+    valid = np.sign(f_lo) * np.sign(f_hi) <= 0
+
+    x = np.full(m, 0.1)
+    x = np.where((x > lo) & (x < hi), x, (lo + hi) / 2)
+    for _ in range(max_iter):
+        f, df = npv(x)
+        # Shrink the bracket around the root
+        same_as_lo = np.sign(f) == np.sign(f_lo)
+        lo = np.where(same_as_lo, x, lo)
+        f_lo = np.where(same_as_lo, f, f_lo)
+        hi = np.where(same_as_lo, hi, x)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            step = x - f / df
+        bisect = ~np.isfinite(step) | (step <= lo) | (step >= hi)
+        new_x = np.where(bisect, (lo + hi) / 2, step)
+
+        done = (np.abs(new_x - x) < tol) | (f == 0)
+        x = new_x
+        if np.all(done | ~valid):
+            break
+
+    return np.where(valid, x, np.nan)
@@ -0,0 +1,139 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+import requests
+
+from book_lookup import BookLookup, make_session
+
+VOLUME = {"items": [{"volumeInfo": {
+    "title": "Dune", "authors": ["Frank Herbert"], "publisher": "Chilton",
+    "publishedDate": "1965", "imageLinks": {"thumbnail": "http://img/dune.jpg"},
+}}]}
+
+
+class QuietServer(ThreadingHTTPServer):
+    # The timeout test hangs up before the reply; don't print the broken pipe
+
+    def handle_error(self, request, client_address):
+        pass
+
+
+class StandInBooksApi:
+    # Local stand-in for the Google Books volumes endpoint. Each ISBN maps to
+    # a list of planned responses: a status code, a JSON body, or ("sleep", s).
+
+    def __init__(self):
+        self.plans = {}
+        self.requests = []
+        api = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                query = parse_qs(urlparse(self.path).query)["q"][0]
+                isbn = query.split(":", 1)[1]
+                api.requests.append(isbn)
+                plan = api.plans.get(isbn, [])
+                step = plan.pop(0) if len(plan) > 1 else (plan[0] if plan else {"totalItems": 0})
+
+                if isinstance(step, tuple):
+                    time.sleep(step[1])
+                    step = {"totalItems": 0}
+                if isinstance(step, int):
+                    self.send_response(step)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                body = json.dumps(step).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = QuietServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/books/v1/volumes"
+        threading.Thread(target=self.server.serve_forever, args=(0.05,), daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def api():
+    api = StandInBooksApi()
+    yield api
+    api.close()
+
+
+def make_lookup(api, tmp_path, **kwargs):
+    kwargs.setdefault("rate", 0)
+    return BookLookup(cache_path=str(tmp_path / "books.sqlite3"), api_url=api.url, **kwargs)
+
+
+def test_cache_hit_makes_no_second_request(api, tmp_path):
+    api.plans["9780441013593"] = [VOLUME]
+    lookup = make_lookup(api, tmp_path)
+
+    first = lookup.fetch("9780441013593")
+    second = lookup.fetch("9780441013593")
+
+    assert first["title"] == "Dune" and first["authors"] == "Frank Herbert"
+    assert second == first
+    assert api.requests == ["9780441013593"]
+
+
+def test_cache_survives_a_new_instance(api, tmp_path):
+    api.plans["9780441013593"] = [VOLUME]
+    make_lookup(api, tmp_path).fetch("9780441013593")
+    assert make_lookup(api, tmp_path).fetch("9780441013593")["title"] == "Dune"
+    assert len(api.requests) == 1
+
+
+def test_negative_result_is_cached_until_negative_ttl(api, tmp_path):
+    lookup = make_lookup(api, tmp_path, negative_ttl=0.2)
+
+    assert lookup.fetch("0000000000") is None
+    assert lookup.fetch("0000000000") is None
+    assert api.requests == ["0000000000"]
+
+    time.sleep(0.3)
+    assert lookup.fetch("0000000000") is None
+    assert api.requests == ["0000000000", "0000000000"]
+
+
+def test_server_error_is_retried(api, tmp_path):
+    api.plans["9780441013593"] = [503, VOLUME]
+    lookup = make_lookup(api, tmp_path)
+
+    assert lookup.fetch("9780441013593")["title"] == "Dune"
+    assert api.requests == ["9780441013593", "9780441013593"]
+
+
+def test_timeout_surfaces_as_request_exception(api, tmp_path):
+    api.plans["9780441013593"] = [("sleep", 1.0)]
+    lookup = make_lookup(api, tmp_path, timeout=(1, 0.2), session=make_session(retries=0))
+
+    with pytest.raises(requests.RequestException):
+        lookup.fetch("9780441013593")
+    assert lookup.cached("9780441013593") == (False, None)
+
+
+def test_fetch_many_reports_errors_per_isbn(api, tmp_path):
+    api.plans["9780441013593"] = [VOLUME]
+    api.plans["1111111111"] = [404]
+    lookup = make_lookup(api, tmp_path, session=make_session(retries=0))
+
+    results = lookup.fetch_many(["9780441013593", "1111111111"])
+
+    assert results["9780441013593"][0]["title"] == "Dune"
+    assert results["1111111111"][0] is None
+    assert isinstance(results["1111111111"][1], requests.HTTPError)
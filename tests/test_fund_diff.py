@@ -0,0 +1,35 @@
+import pandas as pd
+import pytest
+
+from fund_diff import parse_disclosure_name
+
+
+@pytest.mark.parametrize("name, fund, month", [
+    ("Parag Flexi Cap Mar 2024", "Parag Flexi Cap", "2024-03"),
+    ("PPFAS_Mar_2024", "PPFAS", "2024-03"),
+    ("PPFAS_March-2024", "PPFAS", "2024-03"),
+    ("ppfas_mar_2024", "ppfas", "2024-03"),
+    ("Fund_Dec23", "Fund", "2023-12"),
+    ("Fund Mar24", "Fund", "2024-03"),
+    ("Fund 31-Mar-2024", "Fund", "2024-03"),
+    ("PPFAS_31_Mar_2024", "PPFAS", "2024-03"),
+    ("PPFAS_2024-03-31", "PPFAS", "2024-03"),
+    ("PPFAS_2024-04-30", "PPFAS", "2024-04"),
+    ("Mirae 2024_03", "Mirae", "2024-03"),
+    ("PPFAS 31-03-2024", "PPFAS", "2024-03"),
+    ("HDFC Top 100 03-2024", "HDFC Top 100", "2024-03"),
+    ("Sensex 30 Mar 2024", "Sensex 30", "2024-03"),
+])
+def test_parse_disclosure_name(name, fund, month):
+    assert parse_disclosure_name(name) == (fund, pd.Period(month, freq="M"))
+
+
+def test_month_end_files_share_one_fund():
+    names = [f"PPFAS_{period.end_time:%Y-%m-%d}" for period in pd.period_range("2024-01", "2024-12", freq="M")]
+    parsed = [parse_disclosure_name(name) for name in names]
+    assert {fund for fund, _ in parsed} == {"PPFAS"}
+    assert len({month for _, month in parsed}) == 12
+
+
+def test_name_without_month():
+    assert parse_disclosure_name("Quant Small Cap") == ("Quant Small Cap", None)
@@ -0,0 +1,80 @@
+import re
+
+from isbn_index import IsbnIndex
+from library_search import LibrarySearch
+
+
+class FakeSheet:
+    # Stand-in for a gspread worksheet: rows[0] is the header, blank rows are []
+
+    def __init__(self, rows):
+        self.rows = [list(row) for row in rows]
+
+    def row_values(self, n):
+        return self.rows[n - 1] if n <= len(self.rows) else []
+
+    def get(self, a1):
+        start = int(re.match(r"A(\d+)", a1).group(1))
+        rows = self.rows[start - 1:]
+        while rows and not rows[-1]:
+            rows = rows[:-1]  # the API trims trailing blank rows
+        return rows
+
+    def append_rows(self, rows):
+        start = len(self.rows) + 1
+        self.rows.extend(list(row) for row in rows)
+        return {"updates": {"updatedRange": f"Sheet1!A{start}:I{len(self.rows)}"}}
+
+
+def make_index(tmp_path, rows):
+    sheet = FakeSheet([["Title", "ISBN"]] + rows)
+    return sheet, IsbnIndex(sheet, path=str(tmp_path / "index.json"))
+
+
+def test_blank_rows_keep_sheet_positions(tmp_path):
+    sheet, index = make_index(tmp_path, [["A", "111"], [], ["B", "222"]])
+    assert index.isbn_rows == {"111": 2, "222": 4}
+
+    row = ["C", "333"]
+    index.add(row, sheet.append_rows([row]))
+    index.sync(force=True)
+
+    assert [r["ISBN"] for r in index.records()] == ["111", "222", "333"]
+    assert index.isbn_rows["333"] == 5
+
+
+def test_search_sees_each_row_once_across_blank_rows(tmp_path):
+    sheet, index = make_index(tmp_path, [["A", "111"], [], ["B", "222"]])
+    search = LibrarySearch.attach(index)
+
+    row = ["C", "333"]
+    index.add(row, sheet.append_rows([row]))
+    index.sync(force=True)
+    assert search.search("")[0] == 3
+
+    # A rebuild must not bring the misalignment back
+    index.rebuild()
+    row = ["D", "444"]
+    index.add(row, sheet.append_rows([row]))
+    index.sync(force=True)
+
+    total, records = search.search("")
+    assert total == 4
+    assert sorted(r["ISBN"] for r in records) == ["111", "222", "333", "444"]
+
+
+def test_foreign_append_triggers_resync(tmp_path):
+    sheet, index = make_index(tmp_path, [["A", "111"]])
+    sheet.append_rows([["X", "999"]])  # another writer
+
+    row = ["C", "333"]
+    index.add(row, sheet.append_rows([row]))
+
+    assert [r["ISBN"] for r in index.records()] == ["111", "999", "333"]
+
+
+def test_index_reloads_from_disk(tmp_path):
+    sheet, index = make_index(tmp_path, [["A", "111"], [], ["B", "222"]])
+    reloaded = IsbnIndex(sheet, path=index.path)
+    assert reloaded.isbn_rows == {"111": 2, "222": 4}
+    assert len(reloaded.records()) == 2
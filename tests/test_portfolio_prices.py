@@ -0,0 +1,99 @@
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from portfolio_prices import PriceCache, mark_to_market
+
+
+class StandInSource:
+    # Local price source: {ticker: price}, recording every batched call
+
+    def __init__(self, quotes):
+        self.quotes = dict(quotes)
+        self.calls = []
+
+    def __call__(self, tickers):
+        self.calls.append(list(tickers))
+        return {t: self.quotes[t] for t in tickers if t in self.quotes}
+
+
+@pytest.fixture
+def source():
+    return StandInSource({"INFY.NS": 1500.0, "TCS.NS": 3500.0, "SMALLCO.BO": 12.5})
+
+
+def test_one_call_per_exchange(source):
+    prices = PriceCache(source).prices(["INFY", "TCS", "SMALLCO", "UNLISTED"])
+
+    assert len(source.calls) == 2
+    assert source.calls[0] == ["INFY.NS", "TCS.NS", "SMALLCO.NS", "UNLISTED.NS"]
+    assert prices["INFY"] == 1500.0 and prices["SMALLCO"] == 12.5
+    assert np.isnan(prices["UNLISTED"])
+
+
+def test_bse_only_for_nse_misses(source):
+    PriceCache(source).prices(["INFY", "SMALLCO", "UNLISTED"])
+    assert source.calls[1] == ["SMALLCO.BO", "UNLISTED.BO"]
+
+
+def test_no_bse_call_when_nse_has_everything(source):
+    PriceCache(source).prices(["INFY", "TCS"])
+    assert source.calls == [["INFY.NS", "TCS.NS"]]
+
+
+def test_symbols_are_normalized_and_deduplicated(source):
+    prices = PriceCache(source).prices([" infy", "INFY", "tcs "])
+    assert source.calls == [["INFY.NS", "TCS.NS"]]
+    assert list(prices.index) == ["INFY", "TCS"]
+
+
+def test_prices_and_misses_are_cached_within_ttl(source):
+    cache = PriceCache(source, ttl=60)
+    cache.prices(["INFY", "UNLISTED"])
+    calls = len(source.calls)
+
+    prices = cache.prices(["INFY", "UNLISTED"])
+
+    assert len(source.calls) == calls
+    assert prices["INFY"] == 1500.0 and np.isnan(prices["UNLISTED"])
+
+
+def test_only_new_symbols_are_fetched(source):
+    cache = PriceCache(source, ttl=60)
+    cache.prices(["INFY"])
+    cache.prices(["INFY", "TCS"])
+    assert source.calls == [["INFY.NS"], ["TCS.NS"]]
+
+
+def test_refetch_after_ttl(source):
+    cache = PriceCache(source, ttl=0.1)
+    cache.prices(["INFY"])
+    source.quotes["INFY.NS"] = 1600.0
+    time.sleep(0.15)
+
+    assert cache.prices(["INFY"])["INFY"] == 1600.0
+    assert source.calls == [["INFY.NS"], ["INFY.NS"]]
+
+
+def test_mark_to_market_keeps_uploaded_value_for_unpriced_scrips():
+    consolidated = pd.DataFrame({
+        'ScripName': ['INFY', 'UNLISTED'],
+        'Quantity': [2.0, 10.0],
+        'Buying Quanta': [2000.0, 500.0],
+        'Selling Quanta': [2500.0, 400.0],
+        'Gain/Loss': [500.0, -100.0],
+        '% wtge': [86.2, 13.8],
+    })
+    prices = pd.Series({'INFY': 1500.0, 'UNLISTED': np.nan})
+
+    out = mark_to_market(consolidated, prices)
+
+    assert out['Selling Quanta'].tolist() == [3000.0, 400.0]
+    assert out['Gain/Loss'].tolist() == [1000.0, -100.0]
+    assert out['% wtge'].tolist() == pytest.approx([3000 / 34, 400 / 34])
+    assert out['Status'].tolist() == ['Positive', 'Negative']
+    assert np.isnan(out['Live Price'].iloc[1])
+    # The input frame is left untouched
+    assert consolidated['Selling Quanta'].tolist() == [2500.0, 400.0]
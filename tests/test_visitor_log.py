@@ -0,0 +1,124 @@
+import threading
+import time
+
+import pytest
+
+from visitor_log import VisitorLogWriter
+
+
+class FakeWorksheet:
+    # Stand-in for a gspread worksheet: records append_rows calls, or raises
+    # while `failing` is set
+
+    def __init__(self):
+        self.calls = []
+        self.failing = False
+        self._lock = threading.Lock()
+
+    def append_rows(self, rows):
+        if self.failing:
+            raise RuntimeError("quota exceeded")
+        with self._lock:
+            self.calls.append(list(rows))
+
+    @property
+    def rows(self):
+        with self._lock:
+            return [row for call in self.calls for row in call]
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return condition()
+
+
+@pytest.fixture
+def spool(tmp_path):
+    return str(tmp_path / "spool.sqlite3")
+
+
+def make_writer(sheet, spool, **kwargs):
+    kwargs.setdefault("flush_interval", 0.01)
+    kwargs.setdefault("max_backoff", 0.05)
+    return VisitorLogWriter(lambda: sheet, spool_path=spool, **kwargs)
+
+
+def test_rows_are_batched_into_one_call(spool):
+    sheet = FakeWorksheet()
+    writer = make_writer(sheet, spool)
+    writer.close()  # stop the background thread so only flush() writes
+
+    for i in range(5):
+        writer.submit(["2024-01-01", f"visitor {i}"])
+    assert writer.flush() == 5
+
+    assert sheet.calls == [[["2024-01-01", f"visitor {i}"] for i in range(5)]]
+    assert writer.pending_count() == 0
+
+
+def test_flush_splits_by_batch_size(spool):
+    sheet = FakeWorksheet()
+    writer = make_writer(sheet, spool, batch_size=100)
+    writer.close()
+
+    for i in range(250):
+        writer.submit([i])
+    assert writer.flush() == 250
+    assert [len(call) for call in sheet.calls] == [100, 100, 50]
+
+
+def test_rows_stay_spooled_while_sheet_raises(spool):
+    sheet = FakeWorksheet()
+    sheet.failing = True
+    writer = make_writer(sheet, spool)
+    try:
+        for i in range(3):
+            writer.submit([i])
+        time.sleep(0.2)
+        assert sheet.rows == []
+        assert writer.pending_count() == 3
+
+        sheet.failing = False
+        assert wait_for(lambda: writer.pending_count() == 0)
+        assert sheet.rows == [[0], [1], [2]]
+    finally:
+        writer.close()
+
+
+def test_leftover_spool_rows_are_sent_on_restart(spool):
+    down = FakeWorksheet()
+    down.failing = True
+    first = make_writer(down, spool)
+    first.submit(["left over"])
+    first.close()
+    assert first.pending_count() == 1
+
+    sheet = FakeWorksheet()
+    second = make_writer(sheet, spool)
+    try:
+        assert wait_for(lambda: sheet.rows == [["left over"]])
+        assert second.pending_count() == 0
+    finally:
+        second.close()
+
+
+def test_close_drains_the_spool(spool):
+    sheet = FakeWorksheet()
+    writer = make_writer(sheet, spool, flush_interval=60.0)
+    for i in range(10):
+        writer.submit([i])
+    writer.close()
+
+    assert writer.pending_count() == 0
+    assert sheet.rows == [[i] for i in range(10)]
+
+
+def test_backoff_is_bounded_after_many_failures(spool):
+    writer = make_writer(FakeWorksheet(), spool, max_backoff=300.0)
+    writer.close()
+    writer._failures = 1100
+    assert 0 < writer._backoff() <= 300.0
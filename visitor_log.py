@@ -0,0 +1,104 @@
+import json
+import random
+import sqlite3
+import threading
+
+# -----------------------------
+# BUFFERED VISITOR LOG
+# -----------------------------
+# Submissions are written to a local SQLite spool first and pushed to the
+# Google Sheet by a background thread in batches (one append_rows call per
+# batch). Rows stay in the spool until the sheet accepts them, so nothing is
+# lost to quota errors or restarts. Delivery is at-least-once: a crash between
+# the append and the spool delete can repeat a batch.
+
+SPOOL_PATH = "visitor_log_spool.sqlite3"
+
+
+class VisitorLogWriter:
+
+    def __init__(self, open_sheet, spool_path=SPOOL_PATH, batch_size=100,
+                 flush_interval=2.0, max_backoff=300.0):
+        # open_sheet() returns an object with append_rows(rows), e.g. a gspread
+        # worksheet or a local stand-in.
+        self.open_sheet = open_sheet
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_backoff = max_backoff
+
+        self._sheet = None
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._failures = 0
+
+        self._db = sqlite3.connect(spool_path, check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS pending (id INTEGER PRIMARY KEY AUTOINCREMENT, row TEXT NOT NULL)"
+        )
+        self._db.commit()
+
+        # Rows spooled by a previous run are picked up on the first pass
+        self._thread = threading.Thread(target=self._run, name="visitor-log-writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, row):
+        with self._lock:
+            self._db.execute("INSERT INTO pending (row) VALUES (?)", (json.dumps(row),))
+            self._db.commit()
+        self._wake.set()
+
+    def pending_count(self):
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM pending").fetchone()[0]
+
+    def flush(self):
+        # Push everything currently spooled; returns the number of rows written
+        written = 0
+        while True:
+            with self._lock:
+                batch = self._db.execute(
+                    "SELECT id, row FROM pending ORDER BY id LIMIT ?", (self.batch_size,)
+                ).fetchall()
+            if not batch:
+                return written
+
+            if self._sheet is None:
+                self._sheet = self.open_sheet()
+            self._sheet.append_rows([json.loads(row) for _, row in batch])
+
+            with self._lock:
+                self._db.execute("DELETE FROM pending WHERE id <= ?", (batch[-1][0],))
+                self._db.commit()
+            written += len(batch)
+
+    def close(self, timeout=10.0):
+        self._stop.set()
+        self._wake.set()
+        self._thread.join(timeout)
+
+    def _backoff(self):
+        # Exponent capped so long outages cannot overflow the float conversion
+        delay = min(self.max_backoff, self.flush_interval * 2 ** min(self._failures, 20))
+        return delay * random.uniform(0.5, 1.0)
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.flush()
+                self._failures = 0
+            except Exception:
+                # Quota or network error: drop the cached sheet handle and back
+                # off; new submissions keep spooling meanwhile.
+                self._sheet = None
+                self._failures += 1
+                self._stop.wait(self._backoff())
+                continue
+
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+
+        try:
+            self.flush()
+        except Exception:
+            pass